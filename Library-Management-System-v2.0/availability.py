@@ -0,0 +1,182 @@
+"""
+availability.py - Memory-mapped availability bitmap for books.csv
+One bit per books.csv data row (its "slot"), so borrowing or returning a book
+rewrites a single byte in place instead of the whole catalog file.
+
+File layout:
+    magic  b'LAV1'
+    count  uint32   number of slots covered by the bitmap
+    crc    uint32   running CRC32 of the ISBNs of those slots, in order
+    (4 bytes padding)
+    bits   ceil(count / 8) bytes, bit set = available
+
+The CRC ties the bitmap to the row order of books.csv: if the CSV was
+rewritten (or the bitmap is from another catalog) it no longer matches and the
+bitmap is rebuilt from the CSV's own 'available' column.
+"""
+
+import mmap
+import os
+import struct
+import zlib
+from itertools import chain, islice
+
+MAGIC = b'LAV1'
+HEADER = struct.Struct('<4sII4x')
+MIN_CAPACITY = 4096
+
+# The eight bits of every byte value, LSB first
+_BYTE_BITS = [tuple(bool(byte >> bit & 1) for bit in range(8)) for byte in range(256)]
+
+
+def pack_bits(values):
+    """Bytes with bit i set for every true values[i] (LSB-first)"""
+    if not values:
+        return b''
+    number = int(''.join(map('01'.__getitem__, reversed(values))), 2)
+    return number.to_bytes((len(values) + 7) // 8, 'little')
+
+
+def unpack_bits(data, count):
+    """The first count bits of data as bools (LSB-first)"""
+    return list(islice(chain.from_iterable(map(_BYTE_BITS.__getitem__, data)), count))
+
+
+def isbn_crc(isbns):
+    """The running CRC32 of the ISBNs stored in the header"""
+    return zlib.crc32(''.join(isbns).encode())
+
+
+class AvailabilityBitmap:
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self.crc = 0
+        self._file = None
+        self._map = None
+
+    # ---------- load / rebuild ----------
+
+    def attach(self, books):
+        """
+        Overlay the stored availability onto freshly parsed book rows.
+        Slots beyond the bitmap (rows appended just before a crash) keep the
+        value written in the CSV. Rebuilds the bitmap if it does not match.
+        """
+        if not self._open_existing():
+            self.rebuild(books)
+            return
+
+        crc = isbn_crc(book['isbn'] for book in books[:self.count])
+        if self.count > len(books) or crc != self.crc:
+            self.rebuild(books)
+            return
+
+        for slot in range(self.count):
+            books[slot]['available'] = 'True' if self.get(slot) else 'False'
+        if len(books) > self.count:
+            self.extend((b['isbn'], b['available'] == 'True') for b in books[self.count:])
+
+    def availability(self, isbns):
+        """
+        Availability of every slot as bools, if the bitmap covers exactly
+        these ISBNs in this order; None otherwise (attach() then sorts it out).
+        """
+        if not self._open_existing() or self.count != len(isbns) or isbn_crc(isbns) != self.crc:
+            return None
+        return unpack_bits(self._map[HEADER.size:HEADER.size + (self.count + 7) // 8], self.count)
+
+    def rebuild(self, books):
+        """Write a new bitmap covering books in their current CSV order"""
+        self.close()
+        bits = bytearray(max(MIN_CAPACITY, (len(books) + 7) // 8))
+        crc = 0
+        for slot, book in enumerate(books):
+            crc = zlib.crc32(book['isbn'].encode(), crc)
+            if book['available'] == 'True':
+                bits[slot >> 3] |= 1 << (slot & 7)
+
+        tmp = self.path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(books), crc))
+            f.write(bits)
+        os.replace(tmp, self.path)
+
+        self._open_existing()
+
+    def _open_existing(self):
+        self.close()
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < HEADER.size + 1:
+            return False
+        self._file = open(self.path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, self.count, self.crc = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or (self.count + 7) // 8 > len(self._map) - HEADER.size:
+            self.close()
+            return False
+        return True
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # ---------- bit access ----------
+
+    def get(self, slot):
+        return bool(self._map[HEADER.size + (slot >> 3)] & (1 << (slot & 7)))
+
+    def set(self, slot, available):
+        """Flip one slot in place and flush just the page that holds it"""
+        pos = self._set_bit(slot, available)
+        page = pos - pos % mmap.ALLOCATIONGRANULARITY
+        self._map.flush(page, min(mmap.ALLOCATIONGRANULARITY, len(self._map) - page))
+
+    def set_many(self, changes):
+        """Flip several (slot, available) pairs with a single flush"""
+        for slot, available in changes:
+            self._set_bit(slot, available)
+        self._map.flush()
+
+    def _set_bit(self, slot, available):
+        pos = HEADER.size + (slot >> 3)
+        byte = self._map[pos]
+        if available:
+            byte |= 1 << (slot & 7)
+        else:
+            byte &= ~(1 << (slot & 7)) & 0xFF
+        self._map[pos] = byte
+        return pos
+
+    def append(self, isbn, available):
+        """Cover one more slot (a row appended to books.csv); returns the slot"""
+        return self.extend([(isbn, available)])[0]
+
+    def extend(self, entries):
+        """Cover several appended rows with a single flush; returns their slots"""
+        slots = []
+        crc = self.crc
+        for isbn, available in entries:
+            slot = self.count + len(slots)
+            if HEADER.size + (slot >> 3) >= len(self._map):
+                self._grow()
+            self._set_bit(slot, available)
+            crc = zlib.crc32(isbn.encode(), crc)
+            slots.append(slot)
+
+        # Publish the new slots only after their bits are in place
+        self._map.flush()
+        self.count += len(slots)
+        self.crc = crc
+        HEADER.pack_into(self._map, 0, MAGIC, self.count, self.crc)
+        self._map.flush(0, min(mmap.ALLOCATIONGRANULARITY, len(self._map)))
+        return slots
+
+    def _grow(self):
+        size = len(self._map)
+        self._map.close()
+        self._file.truncate(HEADER.size + 2 * (size - HEADER.size))
+        self._map = mmap.mmap(self._file.fileno(), 0)
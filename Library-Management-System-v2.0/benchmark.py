@@ -0,0 +1,765 @@
+"""
+benchmark.py - Scaling checks for the library core
+Runs against a throw-away data folder so the real data/ is never touched.
+
+    python benchmark.py                          # scaling checks + 1k suite
+    python benchmark.py --scales 1k,100k,1M --json results.json
+    python benchmark.py --scales 100k --compare results.json
+
+The suite generates a catalog, members and a multi-year transaction log for
+each scale, then times every public Book, Member, User and Library operation
+(p50/p95, rows/sec) and records peak RSS. --json writes the results so two
+versions can be compared with --compare. Behaviour is covered by the tests
+(python -m pytest -q); this script only measures.
+"""
+
+import argparse
+import csv
+import gc
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# main.py resolves its data folder relative to the working directory, so
+# switch into a scratch directory before importing it.
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+RUN_DIR = os.getcwd()  # command-line paths are relative to this
+WORK_DIR = tempfile.mkdtemp(prefix="library-bench-")
+os.chdir(WORK_DIR)
+sys.path.insert(0, APP_DIR)
+
+import main  # noqa: E402
+from main import Book, Library, LibraryStore, Member, User  # noqa: E402
+from journal import Journal  # noqa: E402
+from log_segments import repair_tail, row_checksum, valid_row  # noqa: E402
+from records import BookRecord, TransactionRecord  # noqa: E402
+
+
+# ==========================
+# Synthetic data
+# ==========================
+def write_history(n_transactions, n_members=500, n_books=2000):
+    """Write a members file and a closed-out transaction log of the given length"""
+    with open(main.MEMBERS_FILE, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=main.Member.fieldnames)
+        writer.writeheader()
+        for m in range(n_members):
+            writer.writerow({'name': f"Member {m}", 'member_id': f"M{m}", 'email': f"m{m}@example.com"})
+
+    with open(main.BOOKS_FILE, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=main.Book.fieldnames)
+        writer.writeheader()
+        for b in range(n_books):
+            writer.writerow({'title': f"Book {b}", 'author': f"Author {b % 97}",
+                             'isbn': str(9780000000000 + b), 'available': 'True'})
+
+    start = datetime(2015, 1, 1)
+    with open(main.TRANSACTIONS_FILE, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=main.TRANSACTION_FIELDS)
+        writer.writeheader()
+        for i in range(n_transactions // 2):
+            member_id = f"M{i % n_members}"
+            isbn = str(9780000000000 + i % n_books)
+            day = start + timedelta(minutes=i)
+            writer.writerow({'member_id': member_id, 'isbn': isbn, 'action': 'BORROW',
+                             'date': day.strftime("%Y-%m-%d %H:%M:%S"),
+                             'due_date': (day + timedelta(days=14)).strftime("%Y-%m-%d")})
+            writer.writerow({'member_id': member_id, 'isbn': isbn, 'action': 'RETURN',
+                             'date': (day + timedelta(days=3)).strftime("%Y-%m-%d %H:%M:%S"),
+                             'due_date': ''})
+
+    # Sidecar files describe the previous data set
+    if main._backend is not None:
+        main._backend.close()
+        main._backend = None
+    for path in (main.OPEN_LOANS_FILE, main.CHECKPOINT_FILE, main.AVAILABILITY_FILE):
+        if os.path.exists(path):
+            os.remove(path)
+    shutil.rmtree(main.LOG_ARCHIVE_DIR, ignore_errors=True)
+    LibraryStore.reset()
+    migrate_if_sqlite()
+
+
+def migrate_if_sqlite():
+    """The generators write CSV; copy it into a fresh database for the SQLite backend"""
+    if main.STORAGE_BACKEND != 'sqlite':
+        return
+    from sqlite_backend import migrate_csv_to_sqlite
+    if os.path.exists(main.SQLITE_FILE):
+        os.remove(main.SQLITE_FILE)
+    migrate_csv_to_sqlite(main.DATA_DIR, main.SQLITE_FILE)
+
+
+def reset_data():
+    """Close the backend and empty the data folder"""
+    if main._backend is not None:
+        main._backend.close()
+        main._backend = None
+    LibraryStore.reset()
+    main.read_cache.clear()
+    shutil.rmtree(main.DATA_DIR, ignore_errors=True)
+    os.makedirs(main.DATA_DIR)
+
+
+def reopen():
+    """Drop the in-memory store so the next call loads from disk"""
+    if main._backend is not None:
+        main._backend.close()
+        main._backend = None
+    LibraryStore.reset()
+    main.read_cache.clear()
+
+
+WORDS = ("Silent Hidden Broken Golden Last Lost Secret Winter Summer Dark Bright Distant "
+         "River Garden Empire Shadow Ocean Mountain Kingdom Night City Forest Dream Storm "
+         "Letters Children Song House Road Journey Machine Memory Light Stone Fire").split()
+FIRST_NAMES = "Ada Alan Grace Mary Chinua Toni Jorge Haruki Isabel Leo Virginia Orhan Wisława Naguib".split()
+LAST_NAMES = "Lovelace Turing Hopper Shelley Achebe Morrison Borges Murakami Allende Tolstoy Woolf Pamuk Szymborska Mahfouz".split()
+
+
+def generate(n_books, years=3, seed=42):
+    """
+    Write a realistic data set: n_books books, n_books // 10 members and about
+    two transactions per book spread over the last `years` years. A few recent
+    loans stay open (some overdue); the last 10% of the catalog was never lent.
+    Returns the row counts written.
+    """
+    rng = random.Random(seed)
+    n_members = max(50, n_books // 10)
+    n_open = max(10, n_books // 50)
+    lent = int(n_books * 0.9)
+    now = datetime.now()
+    start = now - timedelta(days=365 * years)
+    span = (now - start).total_seconds()
+
+    def isbn(i):
+        return str(9780000000000 + i)
+
+    events = []
+    for _ in range(n_books):
+        member_id = f"M{rng.randrange(n_members)}"
+        book = isbn(rng.randrange(n_open, lent))
+        borrowed = start + timedelta(seconds=rng.random() * span * 0.97)
+        returned = borrowed + timedelta(days=rng.randint(1, 20), minutes=rng.randint(0, 600))
+        due = (borrowed + timedelta(days=14)).strftime("%Y-%m-%d")
+        events.append((borrowed.strftime("%Y-%m-%d %H:%M:%S"), member_id, book, 'BORROW', due))
+        events.append((returned.strftime("%Y-%m-%d %H:%M:%S"), member_id, book, 'RETURN', ''))
+    for i in range(n_open):
+        borrowed = now - timedelta(days=rng.randint(1, 30), minutes=rng.randint(0, 600))
+        due = (borrowed + timedelta(days=14)).strftime("%Y-%m-%d")
+        events.append((borrowed.strftime("%Y-%m-%d %H:%M:%S"), f"M{rng.randrange(n_members)}", isbn(i), 'BORROW', due))
+    events.sort()
+
+    with open(main.BOOKS_FILE, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(Book.fieldnames)
+        writer.writerows(
+            (f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i}",
+             f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+             isbn(i), 'False' if i < n_open else 'True')
+            for i in range(n_books)
+        )
+    with open(main.MEMBERS_FILE, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(Member.fieldnames)
+        writer.writerows((f"Member {m}", f"M{m}", f"m{m}@example.com") for m in range(n_members))
+    with open(main.TRANSACTIONS_FILE, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(main.TRANSACTION_FIELDS)
+        writer.writerows((member_id, book, action, day, due) for day, member_id, book, action, due in events)
+
+    migrate_if_sqlite()
+    return {'books': n_books, 'members': n_members, 'transactions': len(events), 'open_loans': n_open}
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process so far, or None where unsupported"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak  # bytes on macOS
+
+
+def measure(fn, budget=0.5, min_runs=3, max_runs=200):
+    """
+    Run fn until it has used `budget` seconds (within min/max runs).
+    Returns (p50 us, p95 us, runs, last result).
+    """
+    samples = []
+    result = None
+    while len(samples) < max_runs:
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - t0) * 1e6)
+        if len(samples) >= min_runs and sum(samples) >= budget * 1e6:
+            break
+    samples.sort()
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return samples[len(samples) // 2], p95, len(samples), result
+
+
+def _is_flat(name, results):
+    """
+    True if the timings for growing log sizes (smallest first) stay flat.
+    Allows generous noise, but a linear (let alone quadratic) cost would
+    grow ~100x across the sizes the checks use.
+    """
+    flat = results[-1] < results[0] * 5 + 50
+    print("  flat" if flat else f"  REGRESSION: {name} grows with the log")
+    return flat
+
+
+def timed(fn, repeat=200):
+    """Median wall time of fn() in microseconds"""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1e6)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+# ==========================
+# Benchmarks
+# ==========================
+def bench_delete_member(sizes=(1_000, 10_000, 100_000)):
+    """
+    The 'member still has books' check in Library.delete_member must not
+    depend on how long the transaction history is.
+    """
+    print("delete_member borrowed-book check")
+    results = []
+
+    for size in sizes:
+        write_history(size)
+        Library.borrow_book("M1", "9780000000001")  # keeps M1 undeletable
+        LibraryStore.get()  # load outside the timed region
+
+        def attempt():
+            try:
+                Library.delete_member("M1")
+            except Exception:
+                pass
+
+        us = timed(attempt)
+        results.append(us)
+        print(f"  {size:>9,} transactions: {us:8.1f} us")
+
+    return _is_flat("check", results)
+
+
+def bench_tail_recovery(sizes=(1_000, 10_000, 100_000), repeat=50):
+    """
+    Startup repair of a transactions.csv that ends in a corrupt row and a
+    torn one must only read the tail, whatever the length of the log.
+    """
+    print("torn log tail recovery")
+    values = ["M1", "9780000000001", "BORROW", "2024-01-01 10:00:00", "2024-01-15"]
+    good = (",".join(values + [row_checksum(values)]) + "\r\n").encode()
+    damage = good + good.replace(b"BORROW", b"RETURN") + b"M1,97800000"
+    valid = lambda line: valid_row(line, main.TRANSACTION_FIELDS)  # noqa: E731
+    results = []
+
+    for size in sizes:
+        write_history(size)
+        with open(main.TRANSACTIONS_FILE, 'ab') as f:
+            f.write(good)
+        intact = os.path.getsize(main.TRANSACTIONS_FILE) + len(good)
+        samples = []
+        for _ in range(repeat):
+            with open(main.TRANSACTIONS_FILE, 'ab') as f:
+                f.write(damage)
+            t0 = time.perf_counter()
+            repair_tail(main.TRANSACTIONS_FILE, valid)
+            samples.append((time.perf_counter() - t0) * 1e6)
+            if os.path.getsize(main.TRANSACTIONS_FILE) != intact:
+                print("  FAILED: the damaged rows were not cut off exactly")
+                return False
+            os.truncate(main.TRANSACTIONS_FILE, intact - len(good))
+        samples.sort()
+        us = samples[len(samples) // 2]
+        results.append(us)
+        print(f"  {size:>9,} transactions: {us:8.1f} us")
+
+    return _is_flat("recovery", results)
+
+
+def bench_range_query(sizes=(1_000, 10_000, 100_000)):
+    """
+    Library.transactions_between for one day must cost O(log n + k): the
+    same day's rows out of a longer log should take about the same time.
+    """
+    print("transactions_between, one day (144 rows)")
+    results = []
+
+    for size in sizes:
+        write_history(0)
+        start = datetime(2015, 1, 1)
+        with open(main.TRANSACTIONS_FILE, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(main.LOG_FIELDS)
+            for i in range(size):  # one row every 10 minutes, in date order
+                values = [f"M{i % 500}", str(9780000000000 + i % 2000), ('BORROW', 'RETURN')[i % 2],
+                          (start + timedelta(minutes=10 * i)).strftime("%Y-%m-%d %H:%M:%S"), '']
+                writer.writerow(values + [row_checksum(values)])
+        migrate_if_sqlite()
+        day = (start + timedelta(minutes=5 * size)).strftime("%Y-%m-%d")
+        if len(Library.transactions_between(day, day)) != 144:
+            print("  FAILED: wrong number of rows for the day")
+            return False
+
+        us = timed(lambda: Library.transactions_between(day, day))
+        results.append(us)
+        print(f"  {size:>9,} transactions: {us:8.1f} us")
+
+    return _is_flat("range query", results)
+
+
+def bench_history(sizes=(1_000, 10_000, 100_000)):
+    """
+    Library.history_for_book must cost O(k) once the history index is built:
+    a book with the same 10 loans in a longer log should take about as long.
+    """
+    print("history_for_book, 10 rows")
+    results = []
+    rare = "9781111111111"
+
+    for size in sizes:
+        reset_data()  # the logs share their first rows, which the index would take as unchanged
+        write_history(0)
+        start = datetime(2015, 1, 1)
+        with open(main.TRANSACTIONS_FILE, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(main.LOG_FIELDS)
+            for i in range(size):  # the rare book at ten evenly spread rows
+                book = rare if i % (size // 10) == 0 else str(9780000000000 + i % 2000)
+                values = [f"M{i % 500}", book, ('BORROW', 'RETURN')[i % 2],
+                          (start + timedelta(minutes=10 * i)).strftime("%Y-%m-%d %H:%M:%S"), '']
+                writer.writerow(values + [row_checksum(values)])
+        migrate_if_sqlite()
+        if len(Library.history_for_book(rare)) != 10:  # also builds the index
+            print("  FAILED: wrong number of rows for the book")
+            return False
+
+        us = timed(lambda: Library.history_for_book(rare))
+        results.append(us)
+        print(f"  {size:>9,} transactions: {us:8.1f} us")
+
+    return _is_flat("history lookup", results)
+
+
+# Runs gui.py up to its first drawn frame; mainloop is stubbed out so it returns
+COLD_START_SCRIPT = """
+import sys, time
+started = time.perf_counter()
+import tkinter
+try:
+    tkinter.Tk().destroy()
+except tkinter.TclError:
+    print('no-display')
+    sys.exit(0)
+started = time.perf_counter()  # probing the display is not part of startup
+tkinter.Tk.mainloop = lambda self, n=0: None
+import os, runpy
+sys.path.insert(0, os.path.dirname(sys.argv[1]))
+g = runpy.run_path(sys.argv[1], run_name='__main__')
+g['app'].update()
+print((time.perf_counter() - started) * 1000)
+"""
+
+
+def bench_cold_start(log_rows=10_000, budget_ms=300):
+    """
+    Time from starting gui.py to the login screen being drawn, with a
+    transaction log of log_rows rows in the data folder.
+    """
+    print(f"GUI cold start @ {log_rows:,} log rows")
+    reset_data()
+    generate(max(1, log_rows // 2))
+    LibraryStore.get()  # a desk that has run before: checkpoints exist
+    reopen()
+
+    result = subprocess.run([sys.executable, "-c", COLD_START_SCRIPT, os.path.join(APP_DIR, "gui.py")],
+                            cwd=WORK_DIR, capture_output=True, text=True)
+    output = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not output:
+        print("  FAILED to start:", result.stderr.strip().splitlines()[-1:])
+        return False
+    if output[-1] == 'no-display':
+        print("  skipped (no display)")
+        return True
+    ms = float(output[-1])
+    ok = ms <= budget_ms
+    print(f"  login screen in {ms:.0f} ms" + ("" if ok else f"  OVER BUDGET ({budget_ms} ms)"))
+    return ok
+
+
+COLD_LOAD_SCRIPT = """
+import sys, time
+started = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+from main import LibraryStore
+LibraryStore.get()
+print((time.perf_counter() - started) * 1000)
+"""
+
+
+def bench_cold_load(log_rows=10_000, budget_ms=1000):
+    """
+    Time for a fresh process to import the core and load the library, with
+    and without the binary snapshot, with a transaction log of log_rows rows.
+    """
+    print(f"cold library load @ {log_rows:,} log rows")
+    reset_data()
+    generate(max(1, log_rows // 2))
+    LibraryStore.get()  # a desk that has run before: checkpoints and snapshot exist
+    reopen()
+
+    def load_ms():
+        result = subprocess.run([sys.executable, "-c", COLD_LOAD_SCRIPT, APP_DIR],
+                                cwd=WORK_DIR, capture_output=True, text=True)
+        if result.returncode != 0:
+            print("  FAILED to load:", result.stderr.strip().splitlines()[-1:])
+            return None
+        return float(result.stdout.strip().splitlines()[-1])
+
+    snapshot = os.path.exists(main.SNAPSHOT_FILE)  # CSV storage only
+    ms = load_ms()
+    if ms is None:
+        return False
+    ok = ms <= budget_ms
+    print(f"  {'with snapshot' if snapshot else 'load':<16} {ms:8.0f} ms" + ("" if ok else f"  OVER BUDGET ({budget_ms} ms)"))
+    if snapshot:
+        os.remove(main.SNAPSHOT_FILE)
+        ms = load_ms()
+        if ms is not None:
+            print(f"  without snapshot {ms:8.0f} ms")
+    return ok
+
+
+def bench_group_commit(rows=2000, writers=8):
+    """
+    Durable single-row appends through the journal, from one writer and from
+    several at once. Rows per fsync shows how well the groups form.
+    """
+    print(f"group commit @ {rows:,} rows")
+    path = os.path.join(WORK_DIR, "journal.bench")
+    lock = threading.Lock()  # stands in for the log's exclusive file lock
+    row = "M1,9780000000001,BORROW,2024-01-01 10:00:00,2024-01-15\r\n"
+    for n in (1, writers):
+        if os.path.exists(path):
+            os.remove(path)
+        journal = Journal(path)
+
+        def write(count):
+            for _ in range(count):
+                with lock:
+                    ticket, end = journal.append(row)
+                journal.wait(ticket)
+
+        threads = [threading.Thread(target=write, args=(rows // n,)) for _ in range(n)]
+        t0 = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - t0
+        print(f"  {n} writer(s): {journal.written / elapsed:10,.0f} rows/s, "
+              f"{journal.written / max(1, journal.groups):5.1f} rows per fsync")
+        journal.close()
+    return True
+
+
+def traced_bytes(fn):
+    """Bytes still allocated by what fn() returns"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = fn()
+        return tracemalloc.get_traced_memory()[0], len(result)
+    finally:
+        tracemalloc.stop()
+
+
+def bench_memory(log_rows=200_000):
+    """Memory held by parsed rows: csv.DictReader dicts vs compact records"""
+    print(f"row memory @ {log_rows:,} log rows")
+    reset_data()
+    generate(max(1, log_rows // 2))
+
+    def as_dicts(path):
+        with open(path, 'r', newline='') as f:
+            return list(csv.DictReader(f))
+
+    def as_records(path, record):
+        with open(path, 'r', newline='') as f:
+            reader = csv.reader(f)
+            parse = record.parser(next(reader))
+            return [parse(row) for row in reader if row]
+
+    results = {}
+    ok = True
+    for name, path, record in (('transactions', main.TRANSACTIONS_FILE, TransactionRecord),
+                               ('books', main.BOOKS_FILE, BookRecord)):
+        dicts, n = traced_bytes(lambda: as_dicts(path))
+        records, _ = traced_bytes(lambda: as_records(path, record))
+        ratio = dicts / records
+        results[name] = {'rows': n, 'dict_bytes': dicts, 'record_bytes': records}
+        print(f"  {name:<13} {n:>9,} rows: dicts {dicts / 2**20:7.1f} MB, records {records / 2**20:7.1f} MB "
+              f"({ratio:.1f}x smaller, {records / n:.0f} B/row)")
+        ok &= ratio >= 1.5
+    if not ok:
+        print("  REGRESSION: records should take at most two thirds of the memory of dicts")
+    return ok, results
+
+
+def operations(counts):
+    """
+    (name, fn, rows) for every public operation, read-only ones first.
+    rows(result) gives the number of rows an operation returned or wrote.
+    """
+    n_books = counts['books']
+    fresh = itertools.count(n_books)  # ISBNs beyond the generated catalog
+    # Never-lent books; each op returns what it borrows, so the pool can cycle
+    pool = itertools.cycle(range(int(n_books * 0.9), n_books))
+    added_books = []
+    added_members = []
+    serial = itertools.count()
+    day = (datetime.now() - timedelta(days=180)).strftime("%Y-%m-%d")  # inside the generated history
+
+    def isbn(i):
+        return str(9780000000000 + i)
+
+    def size(result):
+        return len(result)
+
+    def import_file(kind, rows=1000):
+        path = os.path.join(WORK_DIR, f"import-{kind}.csv")
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            if kind == 'books':
+                writer.writerow(['title', 'author', 'isbn'])
+                writer.writerows((f"Imported {i}", "Bench Author", isbn(next(fresh))) for i in range(rows))
+            else:
+                writer.writerow(['name', 'member_id', 'email'])
+                writer.writerows((f"Imported {i}", f"IMP{next(serial)}", "i@example.com") for i in range(rows))
+        return path
+
+    def append_book():
+        code = isbn(next(fresh))
+        Book("Bench Title", "Bench Author", code).append_book()
+        added_books.append(code)
+
+    def append_member():
+        member_id = f"BENCH{next(serial)}"
+        Member("Bench Member", member_id, "bench@example.com").append_member()
+        added_members.append(member_id)
+
+    def borrow_return():
+        code = isbn(next(pool))
+        Library.borrow_book("BENCHER", code)
+        Library.return_book("BENCHER", code)
+
+    def borrow_return_many():
+        codes = [isbn(next(pool)) for _ in range(5)]
+        Library.borrow_many("BENCHER", codes)
+        Library.return_many("BENCHER", codes)
+
+    # Reads
+    ops = [
+        ('Book.load_books', Book.load_books, size),
+        ('Book.is_valid_isbn', lambda: Book.is_valid_isbn("9780000000001"), None),
+        ('Member.load_members', Member.load_members, size),
+        ('User.load_users', User.load_users, size),
+        ('User.authenticate', lambda: User.authenticate("admin", "admin123"), None),
+        ('Library.view_all_books', Library.view_all_books, size),
+        ('Library.view_all_members', Library.view_all_members, size),
+        ('Library.get_all_users', Library.get_all_users, size),
+        ('Library.search_books', lambda: Library.search_books("golden river"), size),
+        ('Library.search_books_page', lambda: Library.search_books_page("stone", limit=50), lambda r: len(r[0])),
+        ('Library.view_transactions', Library.view_transactions, size),
+        ('Library.view_transactions[page]', lambda: Library.view_transactions(counts['transactions'] // 2, 200), size),
+        ('Library.view_transactions_page', lambda: Library.view_transactions_page(None, 500), lambda r: len(r[0])),
+        ('Library.recent_transactions', lambda: Library.recent_transactions(100), size),
+        ('Library.transactions_between[day]', lambda: Library.transactions_between(day, day), size),
+        ('Library.history_for_book', lambda: Library.history_for_book("9780000000001"), size),
+        ('Library.history_for_member', lambda: Library.history_for_member("M1"), size),
+        ('Library.get_dashboard_stats', Library.get_dashboard_stats, None),
+        ('Library.get_overdue_books', Library.get_overdue_books, size),
+        ('Library.get_all_borrowed_with_due', Library.get_all_borrowed_with_due, size),
+        ('Library.get_borrowed_by_member', lambda: Library.get_borrowed_by_member("M1"), size),
+        ('Library.get_loans_coming_due', lambda: Library.get_loans_coming_due(20), size),
+    ]
+    # Writes
+    ops += [
+        ('Book.append_book', append_book, None),
+        ('Member.append_member', append_member, None),
+        ('User.append_user', lambda: User(f"bench{next(serial)}", "pw", "librarian", "Bench").append_user(), None),
+        ('User.create_default_users', User.create_default_users, None),
+        ('Library.add_user', lambda: Library.add_user(f"bench{next(serial)}", "pw", "member", "Bench"), None),
+        ('Library.borrow_book+return_book', borrow_return, None),
+        ('Library.borrow_many+return_many[5]', borrow_return_many, None),
+        ('Library.edit_book', lambda: Library.edit_book(added_books[-1], new_title=f"Edited {next(serial)}"), None),
+        ('Library.edit_member', lambda: Library.edit_member(added_members[-1], new_name=f"Edited {next(serial)}"), None),
+        ('Library.delete_book', lambda: Library.delete_book(added_books.pop()), None),
+        ('Library.delete_member', lambda: Library.delete_member(added_members.pop()), None),
+        ('Library.import_books[1000]', lambda: Library.import_books(import_file('books')), lambda r: r['accepted']),
+        ('Library.import_members[1000]', lambda: Library.import_members(import_file('members')), lambda r: r['accepted']),
+    ]
+    return ops
+
+
+def parse_scale(text):
+    text = text.strip()
+    for suffix, factor in (('k', 1_000), ('M', 1_000_000)):
+        if text.endswith(suffix):
+            return int(float(text[:-1]) * factor)
+    return int(text)
+
+
+def bench_operations(scale, budget=0.5):
+    """Generate one data set and time every operation against it"""
+    n_books = parse_scale(scale)
+    print(f"operations @ {scale} ({main.STORAGE_BACKEND})")
+    reset_data()
+
+    t0 = time.perf_counter()
+    counts = generate(n_books)
+    generated = time.perf_counter() - t0
+
+    # The first load also folds the generated log into checkpoints/segments
+    t0 = time.perf_counter()
+    LibraryStore.get()
+    first_load = time.perf_counter() - t0
+    reopen()
+    t0 = time.perf_counter()
+    LibraryStore.get()
+    load = time.perf_counter() - t0
+    loaded_rows = counts['books'] + counts['members']
+    print(f"  generate {generated:.2f}s, first load {first_load:.2f}s, load {load:.2f}s")
+
+    # Reserve a borrower with no history (and so nothing overdue)
+    Member("Bench Borrower", "BENCHER", "bencher@example.com").append_member()
+
+    # Each operation may run once per budget; mutations need enough targets
+    results = {}
+    for name, fn, rows in operations(counts):
+        if name in ('Library.edit_book', 'Library.delete_book'):
+            runs = dict(max_runs=results['Book.append_book']['runs'])
+        elif name in ('Library.edit_member', 'Library.delete_member'):
+            runs = dict(max_runs=results['Member.append_member']['runs'])
+        else:
+            runs = {}
+        p50, p95, n, result = measure(fn, budget, **runs)
+        entry = {'p50_us': round(p50, 1), 'p95_us': round(p95, 1), 'runs': n}
+        if rows is not None:
+            entry['rows'] = rows(result)
+            entry['rows_per_sec'] = round(entry['rows'] / (p50 / 1e6)) if p50 else None
+        results[name] = entry
+        print(f"  {name:<40} p50 {p50:>12,.1f} us   p95 {p95:>12,.1f} us   ({n} runs)")
+
+    peak = peak_rss_kb()
+    if peak is not None:
+        print(f"  peak RSS {peak / 1024:,.1f} MB")
+    return {
+        'counts': counts,
+        'generate_seconds': round(generated, 3),
+        'first_load_seconds': round(first_load, 3),
+        'load_seconds': round(load, 3),
+        'load_rows_per_sec': round(loaded_rows / load) if load else None,
+        'peak_rss_kb': peak,
+        'operations': results,
+    }
+
+
+def compare(old, new, threshold=1.5):
+    """Print p50 ratios new/old per operation; returns False if any slowed past threshold"""
+    ok = True
+    for scale, result in new['scales'].items():
+        before = old.get('scales', {}).get(scale)
+        if not before:
+            continue
+        print(f"compare @ {scale}")
+        for name, entry in result['operations'].items():
+            prev = before['operations'].get(name)
+            if not prev or not prev['p50_us']:
+                continue
+            ratio = entry['p50_us'] / prev['p50_us']
+            flag = "  SLOWER" if ratio > threshold else ""
+            print(f"  {name:<40} {ratio:6.2f}x{flag}")
+            ok &= ratio <= threshold
+    return ok
+
+
+def run_all(scales=('1k',), json_path=None, compare_path=None, budget=0.5, cold_start_rows=10_000,
+            memory_rows=200_000, cold_load_rows=10_000):
+    ok = True
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'backend': main.STORAGE_BACKEND,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'scales': {},
+    }
+    try:
+        ok &= bench_delete_member()
+        ok &= bench_tail_recovery()
+        ok &= bench_range_query()
+        ok &= bench_history()
+        ok &= bench_cold_start(cold_start_rows)
+        ok &= bench_cold_load(cold_load_rows)
+        ok &= bench_group_commit()
+        memory_ok, report['memory'] = bench_memory(memory_rows)
+        ok &= memory_ok
+        for scale in scales:
+            report['scales'][scale] = bench_operations(scale, budget)
+    finally:
+        reopen()
+        os.chdir(APP_DIR)
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {json_path}")
+    if compare_path:
+        with open(compare_path, 'r') as f:
+            ok &= compare(json.load(f), report)
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Library core benchmarks")
+    parser.add_argument("--scales", default="1k", help="comma-separated catalog sizes, e.g. 1k,100k,1M")
+    parser.add_argument("--json", help="write machine-readable results to this file")
+    parser.add_argument("--compare", help="earlier --json results to compare against")
+    parser.add_argument("--budget", type=float, default=0.5, help="seconds of timing per operation")
+    parser.add_argument("--cold-start", type=parse_scale, default=10_000, metavar="ROWS",
+                        help="log rows for the GUI cold-start check (budget 300 ms at 1M)")
+    parser.add_argument("--cold-load", type=parse_scale, default=10_000, metavar="ROWS",
+                        help="log rows for the cold library load check (budget 1 s at 1M)")
+    parser.add_argument("--memory", type=parse_scale, default=200_000, metavar="ROWS",
+                        help="log rows for the dict vs record memory comparison")
+    args = parser.parse_args()
+
+    # Paths given on the command line are relative to where it was run
+    json_path = os.path.abspath(os.path.join(RUN_DIR, args.json)) if args.json else None
+    compare_path = os.path.abspath(os.path.join(RUN_DIR, args.compare)) if args.compare else None
+    sys.exit(0 if run_all(args.scales.split(','), json_path, compare_path, args.budget, args.cold_start, args.memory,
+                     args.cold_load) else 1)
@@ -0,0 +1,61 @@
+"""
+conftest.py - Shared pytest fixtures
+main.py keeps its data folder relative to the working directory, so every
+test runs in its own empty folder and starts from a fresh backend and store.
+
+    python -m pytest -q
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, APP_DIR)
+os.chdir(tempfile.mkdtemp(prefix="library-tests-"))  # before main.py creates data/
+
+import main  # noqa: E402
+
+
+def _forget():
+    if main._backend is not None:
+        main._backend.close()
+        main._backend = None
+    main.LibraryStore.reset()
+    main.read_cache.clear()
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """An empty data folder, used through the CSV backend"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, 'STORAGE_BACKEND', 'csv')
+    os.makedirs(main.DATA_DIR)
+    _forget()
+    yield tmp_path
+    _forget()
+
+
+@pytest.fixture(params=['csv', 'sqlite'])
+def backend_name(request, data_dir, monkeypatch):
+    """Runs a test once per storage backend"""
+    monkeypatch.setattr(main, 'STORAGE_BACKEND', request.param)
+    return request.param
+
+
+@pytest.fixture
+def reopen():
+    """Drop the backend and store so the next call loads from disk"""
+    return _forget
+
+
+@pytest.fixture
+def library(data_dir):
+    """A small catalog: books 9780000000000-04, members M1 and M2"""
+    for i in range(5):
+        main.Book(f"Book {i}", "Author", str(9780000000000 + i)).append_book()
+    for member_id in ("M1", "M2"):
+        main.Member(f"Member {member_id}", member_id, f"{member_id}@example.com").append_member()
+    return [str(9780000000000 + i) for i in range(5)]
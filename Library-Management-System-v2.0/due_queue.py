@@ -0,0 +1,84 @@
+"""
+due_queue.py - Min-heap of open loans keyed by due date
+Due dates are held as integer day ordinals (date.toordinal()), so overdue
+checks are integer comparisons instead of strptime calls. Closed loans are
+removed lazily: their heap entries are skipped until the next compaction.
+"""
+
+import heapq
+import itertools
+from datetime import date
+
+
+def day_ordinal(day):
+    """'YYYY-MM-DD' (or a 'YYYY-MM-DD HH:MM:SS' timestamp) -> day ordinal"""
+    return date.fromisoformat(day[:10]).toordinal()
+
+
+class DueQueue:
+    def __init__(self):
+        self.heap = []      # (due ordinal, serial, key)
+        self.live = {}      # key -> (due ordinal, serial) of the open loan
+        self._serial = itertools.count()
+
+    def __len__(self):
+        return len(self.live)
+
+    def push(self, key, due):
+        """Track a loan (re-borrowing the same key replaces its old entry)"""
+        serial = next(self._serial)
+        self.live[key] = (due, serial)
+        heapq.heappush(self.heap, (due, serial, key))
+
+    def discard(self, key):
+        if self.live.pop(key, None) is not None and len(self.heap) > 2 * len(self.live) + 64:
+            self._compact()
+
+    def due(self, key):
+        entry = self.live.get(key)
+        return entry[0] if entry else None
+
+    def _compact(self):
+        self.heap = [(due, serial, key) for key, (due, serial) in self.live.items()]
+        heapq.heapify(self.heap)
+
+    def _is_live(self, entry):
+        due, serial, key = entry
+        return self.live.get(key) == (due, serial)
+
+    def due_on_or_before(self, day):
+        """All live (due, key) with due <= day, earliest first - O(k log k)"""
+        found = []
+        heap = self.heap
+        stack = [0] if heap else []
+        # Heap order means a node past the cut-off has no qualifying children
+        while stack:
+            i = stack.pop()
+            entry = heap[i]
+            if entry[0] > day:
+                continue
+            if self._is_live(entry):
+                found.append((entry[0], entry[2]))
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    stack.append(child)
+        found.sort()
+        return found
+
+    def next_due(self, n, after=None):
+        """The n earliest live loans (optionally only those due after a day) - O(n log n)"""
+        found = []
+        heap = self.heap
+        frontier = [(heap[0], 0)] if heap else []
+        while frontier and len(found) < n:
+            entry, i = heapq.heappop(frontier)
+            if self._is_live(entry) and (after is None or entry[0] > after):
+                found.append((entry[0], entry[2]))
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+        return found
+
+    def ordered(self):
+        """Every live loan, earliest due first"""
+        return sorted((due, key) for key, (due, serial) in self.live.items())
@@ -0,0 +1,74 @@
+"""
+file_format.py - Pieces shared by the binary cache files
+library.snap (snapshot.py) and history.idx (history_index.py) are laid out
+the same way, and every cache checks its source files the same way:
+    stamp()       (inode, size, mtime_ns) of a file, None if it is missing;
+                  a different stamp means the file was changed or replaced
+    write()       header + body, swapped in with file_lock.write_atomic()
+    read_body()   the body of such a file, once the header checks out
+    ints()        little-endian int32 arrays to and from bytes
+    int_bytes()
+
+File layout:
+    magic    4 bytes, names the file type
+    version  uint32
+    crc      uint32   CRC32 of everything after the header
+    length   uint32   bytes after the header
+    body
+"""
+
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+import file_lock
+
+HEADER = struct.Struct('<4sIII')
+
+
+def stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def write(path, magic, version, body):
+    """Replace path with a header for body followed by body"""
+    def write_parts(f):
+        f.write(HEADER.pack(magic, version, zlib.crc32(body), len(body)))
+        f.write(body)
+    file_lock.write_atomic(path, write_parts, binary=True)
+
+
+def read_body(data, magic, version):
+    """
+    The body of a file written by write(), as a memoryview. Raises
+    ValueError (struct.error if data is too short for a header) unless the
+    magic, version, length and checksum all match.
+    """
+    found_magic, found_version, crc, length = HEADER.unpack_from(data, 0)
+    body = memoryview(data)[HEADER.size:]
+    if found_magic != magic or found_version != version or len(body) != length:
+        raise ValueError(f"Not a current {magic.decode(errors='replace')} file")
+    if zlib.crc32(body) != crc:
+        raise ValueError(f"{magic.decode(errors='replace')} checksum mismatch")
+    return body
+
+
+def ints(data):
+    numbers = array('i')
+    numbers.frombytes(data)
+    if sys.byteorder == 'big':
+        numbers.byteswap()
+    return numbers
+
+
+def int_bytes(numbers):
+    if sys.byteorder == 'big':
+        numbers = array('i', numbers)
+        numbers.byteswap()
+    return numbers.tobytes()
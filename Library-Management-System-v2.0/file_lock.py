@@ -0,0 +1,149 @@
+"""
+file_lock.py - Cross-process locks for the CSV data folder
+Several desks may share one data/ folder. Each dataset file gets a companion
+'<file>.lock': shared() lets any number of readers in, exclusive() admits a
+single writer. Locks are reentrant within a process, so a writer can call
+helpers that lock the same file again.
+
+fcntl.flock is used where available. Elsewhere (Windows) the fallback is a
+'<file>.lck' file created with O_EXCL; it only has exclusive mode, and a lock
+file older than STALE_SECONDS is assumed to be left over from a crash.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import instrumentation
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+TIMEOUT_SECONDS = 30
+STALE_SECONDS = 60
+RETRY_SECONDS = 0.01
+
+
+class _Held:
+    """This process's hold on one lock file"""
+
+    def __init__(self):
+        self.mutex = threading.RLock()  # one thread of this process at a time
+        self.depth = 0
+        self.mode = None
+        self.fd = None
+
+
+_held = {}
+_registry_lock = threading.Lock()
+
+
+def _entry(path):
+    with _registry_lock:
+        entry = _held.get(path)
+        if entry is None:
+            entry = _held[path] = _Held()
+        return entry
+
+
+@contextmanager
+def shared(path):
+    """Read lock on a dataset file"""
+    with _locked(path, exclusive=False):
+        yield
+
+
+@contextmanager
+def exclusive(path):
+    """Write lock on a dataset file"""
+    with _locked(path, exclusive=True):
+        yield
+
+
+@contextmanager
+def _locked(path, exclusive):
+    entry = _entry(os.path.abspath(path))
+    with entry.mutex:
+        if entry.depth == 0:
+            _acquire(entry, path, exclusive)
+        elif exclusive and entry.mode == 'shared':
+            _upgrade(entry, path)
+        entry.depth += 1
+        try:
+            yield
+        finally:
+            entry.depth -= 1
+            if entry.depth == 0:
+                _release(entry, path)
+
+
+def _acquire(entry, path, exclusive):
+    if fcntl is not None:
+        entry.fd = os.open(path + '.lock', os.O_RDWR | os.O_CREAT, 0o666)
+        fcntl.flock(entry.fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+    else:
+        _create_lock_file(path + '.lck')
+    entry.mode = 'exclusive' if exclusive else 'shared'
+
+
+def _upgrade(entry, path):
+    if fcntl is not None:
+        fcntl.flock(entry.fd, fcntl.LOCK_EX)
+    entry.mode = 'exclusive'
+
+
+def _release(entry, path):
+    if fcntl is not None:
+        fcntl.flock(entry.fd, fcntl.LOCK_UN)
+        os.close(entry.fd)
+        entry.fd = None
+    else:
+        try:
+            os.remove(path + '.lck')
+        except OSError:
+            pass
+    entry.mode = None
+
+
+def _create_lock_file(lock_path):
+    deadline = time.monotonic() + TIMEOUT_SECONDS
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > STALE_SECONDS:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue  # released meanwhile
+            if time.monotonic() > deadline:
+                raise Exception(f"Timed out waiting for {lock_path}")
+            time.sleep(RETRY_SECONDS)
+        else:
+            os.write(fd, str(os.getpid()).encode())
+            os.close(fd)
+            return
+
+
+def write_atomic(path, write, binary=False):
+    """
+    Replace path with the output of write(f) in one step: readers see either
+    the old file or the new one, never a half-written file. f is a text
+    file for csv/json writers, or a binary one if binary is true.
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with (open(tmp, 'wb') if binary else open(tmp, 'w', newline='')) as f:
+            write(f)
+            instrumentation.count_write(f.tell())
+            f.flush()
+            os.fsync(f.fileno())  # the data is on disk before the name points at it
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
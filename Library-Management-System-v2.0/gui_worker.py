@@ -0,0 +1,96 @@
+"""
+gui_worker.py - Runs library calls off the Tk main thread
+Tk is single-threaded, so the worker never touches widgets: each job's result
+is queued and handed to its callback from app.after() on the main thread.
+Jobs run one at a time on a single thread, which also keeps LibraryStore
+(not thread-safe) out of concurrent use.
+
+Every job belongs to a view ('search', 'logs', ...). Submitting a new job for
+a view supersedes the previous one: if it has not started it is skipped, and
+if it is already running its result is dropped. That suits reads only;
+writes are submitted with supersede=False, so each one runs and reports back.
+"""
+
+import queue
+import threading
+
+POLL_MS = 16  # ~60 fps while jobs are in flight
+
+
+class BackgroundWorker:
+    def __init__(self, root, on_busy=None):
+        self.root = root
+        self.on_busy = on_busy    # called with True/False on the Tk thread
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.current = {}         # view -> serial of the job that still counts
+        self.pending = 0          # submitted jobs whose result is not delivered yet
+        self.polling = False
+        self._serial = 0
+        self.thread = threading.Thread(target=self._run, name="library-worker", daemon=True)
+        self.thread.start()
+
+    def submit(self, view, fn, on_done=None, on_error=None, supersede=True):
+        """
+        Run fn() on the worker thread; on_done(result) or on_error(exception)
+        then runs on the Tk thread, unless a newer job for the view arrived.
+        Jobs submitted with supersede=False are never skipped or dropped.
+        """
+        self._serial += 1
+        if supersede:
+            self.current[view] = self._serial
+        else:
+            view = None  # not tracked: always runs and reports
+        self.pending += 1
+        self.jobs.put((view, self._serial, fn, on_done, on_error))
+        if self.pending == 1 and self.on_busy:
+            self.on_busy(True)
+        if not self.polling:
+            self.polling = True
+            self.root.after(POLL_MS, self._poll)
+
+    def cancel(self, view):
+        """Forget the in-flight job of a view (its callbacks will not run)"""
+        self.current.pop(view, None)
+
+    def busy(self):
+        return self.pending > 0
+
+    # ---------- worker thread ----------
+
+    def _run(self):
+        while True:
+            view, serial, fn, on_done, on_error = self.jobs.get()
+            if view is not None and self.current.get(view) != serial:
+                self.results.put((view, serial, None, None, None, None))  # superseded
+                continue
+            try:
+                self.results.put((view, serial, on_done, on_error, fn(), None))
+            except Exception as e:
+                self.results.put((view, serial, on_done, on_error, None, e))
+
+    # ---------- Tk thread ----------
+
+    def _poll(self):
+        while True:
+            try:
+                view, serial, on_done, on_error, result, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            if view is not None:
+                if self.current.get(view) != serial:
+                    continue
+                del self.current[view]
+            if error is not None:
+                if on_error:
+                    on_error(error)
+            elif on_done:
+                on_done(result)
+
+        if self.pending:
+            self.root.after(POLL_MS, self._poll)
+        else:
+            self.polling = False
+            if self.on_busy:
+                self.on_busy(False)
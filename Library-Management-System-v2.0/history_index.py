@@ -0,0 +1,163 @@
+"""
+history_index.py - Per-book and per-member index of the transaction log
+Maps every ISBN and every member ID to the positions of its rows in the
+log, so one book's or one member's history is read without scanning every
+month. A position is the row's number in the whole log, counting from the
+first row of the oldest archived segment through transactions.csv.
+Rotation moves rows into segments in order, so positions never change.
+
+The index is built on first use and kept up to date as rows are appended.
+It is saved to history.idx once SAVE_EVERY rows were added since the last
+save, and on close. A saved index is caught up with the rows appended
+after it, here or at another desk.
+
+File layout (header as in file_format.py):
+    magic    b'LHI1'
+    version  uint32
+    crc      uint32   CRC32 of everything after the header
+    length   uint32   bytes after the header
+    meta     uint32 length + JSON: rows indexed, the last row's key, the
+             active log's inode and the byte offset indexed up to, and the
+             blob sizes of each field
+    blobs    per field: keys (UTF-8, NUL-joined), int32 row count per key,
+             int32 positions grouped by key
+"""
+
+import json
+import struct
+from array import array
+
+import file_format
+import instrumentation
+
+MAGIC = b'LHI1'
+VERSION = 1
+META_LENGTH = struct.Struct('<I')
+
+FIELDS = ('isbn', 'member_id')
+
+# Rows added since the last save before the index is written again
+SAVE_EVERY = 1000
+
+
+def row_key(t):
+    """What identifies a log row when checking the log was not rewritten"""
+    return [t['member_id'], t['isbn'], t['date']]
+
+
+class HistoryIndex:
+    def __init__(self, path):
+        self.path = path
+        self.loaded = False
+        self.clear()
+
+    def clear(self):
+        """Forget every row, so the next catch-up starts from the first one"""
+        self.positions = {field: {} for field in FIELDS}  # field -> key -> array of positions
+        self.rows = 0      # log rows indexed
+        self.last = None   # row_key() of the last indexed row
+        self.ino = None    # inode of the active log ...
+        self.end = 0       # ... and the byte offset in it indexed up to
+        self.saved = 0     # rows in the saved file
+
+    # ---------- lookups ----------
+
+    def lookup(self, field, key):
+        """Positions of the rows whose field is key, oldest first"""
+        return list(self.positions[field].get(key, ()))
+
+    # ---------- updates ----------
+
+    def add(self, rows):
+        """Index rows that directly follow the last indexed one"""
+        by_field = [(field, self.positions[field]) for field in FIELDS]
+        position = self.rows
+        t = None
+        for t in rows:
+            for field, index in by_field:
+                key = t[field]
+                found = index.get(key)
+                if found is None:
+                    found = index[key] = array('i')
+                found.append(position)
+            position += 1
+        if t is not None:
+            self.rows = position
+            self.last = row_key(t)
+
+    def appended(self, rows, ino, start, end):
+        """
+        Index rows just written to bytes [start, end) of the active log. If
+        the index did not reach exactly start, the next catch-up reads them.
+        """
+        if self.loaded and self.ino == ino and self.end == start:
+            self.add(rows)
+            self.end = end
+
+    # ---------- file ----------
+
+    def load(self):
+        """Read the saved index; a missing or damaged file leaves it empty"""
+        self.loaded = True
+        self.clear()
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return
+        instrumentation.count_read(len(data))
+        try:
+            self._parse(data)
+        except (ValueError, KeyError, TypeError, struct.error):
+            self.clear()  # rebuilt by the next catch-up
+
+    def _parse(self, data):
+        body = file_format.read_body(data, MAGIC, VERSION)
+
+        meta_length, = META_LENGTH.unpack_from(body, 0)
+        offset = META_LENGTH.size + meta_length
+        meta = json.loads(bytes(body[META_LENGTH.size:offset]))
+        for field in FIELDS:
+            blobs = []
+            for size in meta['sizes'][field]:
+                blobs.append(bytes(body[offset:offset + size]))
+                offset += size
+            keys = blobs[0].decode('utf-8').split('\x00') if blobs[0] else []
+            counts, positions = file_format.ints(blobs[1]), file_format.ints(blobs[2])
+            if len(keys) != len(counts) or sum(counts) != len(positions):
+                raise ValueError("History index blobs do not match")
+            index = self.positions[field]
+            start = 0
+            for key, n in zip(keys, counts):
+                index[key] = positions[start:start + n]
+                start += n
+        self.rows = self.saved = meta['rows']
+        self.last = meta['last']
+        self.ino = meta['ino']
+        self.end = meta['end']
+
+    def save(self):
+        """Write the index out in one atomic replace"""
+        sizes = {}
+        blobs = []
+        for field in FIELDS:
+            index = self.positions[field]
+            keys = '\x00'.join(index)
+            if keys.count('\x00') != max(0, len(index) - 1):
+                return  # a key with a NUL in it: the index stays in memory only
+            positions = array('i')
+            for found in index.values():
+                positions.extend(found)
+            field_blobs = [keys.encode('utf-8'), file_format.int_bytes(array('i', map(len, index.values()))),
+                           file_format.int_bytes(positions)]
+            sizes[field] = list(map(len, field_blobs))
+            blobs.extend(field_blobs)
+        meta = json.dumps({'rows': self.rows, 'last': self.last, 'ino': self.ino,
+                           'end': self.end, 'sizes': sizes}).encode()
+        body = b''.join([META_LENGTH.pack(len(meta)), meta] + blobs)
+
+        try:
+            file_format.write(self.path, MAGIC, VERSION, body)
+        except OSError:
+            return  # only a cache of the log; try again later
+        self.saved = self.rows
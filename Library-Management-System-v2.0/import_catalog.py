@@ -0,0 +1,46 @@
+"""
+import_catalog.py - Bulk import of books or members from a CSV file
+
+    python import_catalog.py books donation.csv
+    python import_catalog.py members new_members.csv
+
+Books need title, author and isbn columns (available is optional); members
+need name, member_id and email. Rejected rows are listed in
+<source>.rejects.csv next to the source file.
+"""
+
+import csv
+import sys
+
+from main import Library
+
+
+def main(argv):
+    if len(argv) != 3 or argv[1] not in ('books', 'members'):
+        print(__doc__.strip())
+        return 2
+
+    kind, source = argv[1], argv[2]
+    if kind == 'books':
+        report = Library.import_books(source)
+    else:
+        report = Library.import_members(source)
+
+    print(f"Read {report['rows']} rows in {report['seconds']:.2f}s "
+          f"({report['rows_per_sec']:,.0f} rows/sec)")
+    print(f"Imported: {report['accepted']}")
+    print(f"Rejected: {len(report['rejected'])}")
+
+    if report['rejected']:
+        rejects_file = source + '.rejects.csv'
+        with open(rejects_file, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(report['rejected'][0].keys()))
+            writer.writeheader()
+            writer.writerows(report['rejected'])
+        print(f"Rejected rows written to {rejects_file}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,208 @@
+"""
+instrumentation.py - Opt-in per-operation timing and I/O accounting
+Off unless LIBRARY_INSTRUMENT=1 is set. When on, every public method of
+Book, Member, User and Library is wrapped to record per call:
+    - latency, as a histogram with power-of-two microsecond buckets
+    - bytes read and written, and rows parsed from the data files
+I/O is counted where it happens (read cache misses, log reads, appends,
+file rewrites) and charged to every instrumented call in progress, so the
+numbers for Library.borrow_book include the files it made Book or Member
+reload. That is the read amplification per call.
+
+snapshot() returns the counters as a dict. With LIBRARY_INSTRUMENT_FILE set
+they are also dumped there as JSON every LIBRARY_INSTRUMENT_INTERVAL seconds
+(default 60) and on exit.
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+
+ENABLED = os.environ.get("LIBRARY_INSTRUMENT", "") not in ("", "0")
+DUMP_FILE = os.environ.get("LIBRARY_INSTRUMENT_FILE")
+DUMP_INTERVAL = float(os.environ.get("LIBRARY_INSTRUMENT_INTERVAL", "60"))
+
+BUCKETS = 32  # bucket k counts calls under 2**k microseconds; the last one is open-ended
+
+_stats = {}
+_lock = threading.Lock()
+_local = threading.local()
+_started = time.time()
+
+
+class _Op:
+    """Counters for one operation name"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_us = 0.0
+        self.max_us = 0.0
+        self.buckets = [0] * BUCKETS
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.rows_read = 0
+
+
+def _frames():
+    frames = getattr(_local, 'frames', None)
+    if frames is None:
+        frames = _local.frames = []
+    return frames
+
+
+# ==========================
+# I/O accounting (called by the storage code)
+# ==========================
+def count_read(nbytes, rows=0):
+    """Charge bytes read and rows parsed to the calls in progress"""
+    if not ENABLED:
+        return
+    for frame in _frames():
+        frame[0] += nbytes
+        frame[1] += rows
+
+
+def count_write(nbytes):
+    """Charge bytes written to the calls in progress"""
+    if not ENABLED:
+        return
+    for frame in _frames():
+        frame[2] += nbytes
+
+
+# ==========================
+# Wrapping
+# ==========================
+def _timed(name, fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        frame = [0, 0, 0]  # bytes read, rows read, bytes written
+        frames = _frames()
+        frames.append(frame)
+        failed = False
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            us = (time.perf_counter() - t0) * 1e6
+            frames.pop()
+            _record(name, us, frame, failed)
+    return wrapper
+
+
+def _record(name, us, frame, failed):
+    with _lock:
+        op = _stats.get(name)
+        if op is None:
+            op = _stats[name] = _Op()
+        op.calls += 1
+        op.errors += failed
+        op.total_us += us
+        op.max_us = max(op.max_us, us)
+        op.buckets[min(int(us).bit_length(), BUCKETS - 1)] += 1
+        op.bytes_read += frame[0]
+        op.rows_read += frame[1]
+        op.bytes_written += frame[2]
+
+
+def install(*classes):
+    """Wrap the public methods of each class (no-op unless enabled)"""
+    if not ENABLED:
+        return
+    for cls in classes:
+        for name, attr in list(vars(cls).items()):
+            if name.startswith('_'):
+                continue
+            label = f"{cls.__name__}.{name}"
+            if isinstance(attr, staticmethod):
+                setattr(cls, name, staticmethod(_timed(label, attr.__func__)))
+            elif isinstance(attr, classmethod):
+                setattr(cls, name, classmethod(_timed(label, attr.__func__)))
+            elif callable(attr):
+                setattr(cls, name, _timed(label, attr))
+    if DUMP_FILE:
+        _start_dumper()
+
+
+# ==========================
+# Reporting
+# ==========================
+def _percentile(buckets, calls, fraction):
+    """Upper bound (us) of the bucket holding the given fraction of calls"""
+    rank = max(1, int(calls * fraction + 0.5))
+    seen = 0
+    for k, n in enumerate(buckets):
+        seen += n
+        if seen >= rank:
+            return 2 ** k
+    return 2 ** (BUCKETS - 1)
+
+
+def snapshot():
+    """Counters per operation, slowest total time first"""
+    with _lock:
+        ops = {}
+        for name, op in sorted(_stats.items(), key=lambda item: -item[1].total_us):
+            ops[name] = {
+                'calls': op.calls,
+                'errors': op.errors,
+                'total_ms': round(op.total_us / 1000, 3),
+                'mean_us': round(op.total_us / op.calls, 1),
+                'p50_us': _percentile(op.buckets, op.calls, 0.50),
+                'p95_us': _percentile(op.buckets, op.calls, 0.95),
+                'max_us': round(op.max_us, 1),
+                'histogram_us': {f"<{2 ** k}": n for k, n in enumerate(op.buckets) if n},
+                'bytes_read': op.bytes_read,
+                'bytes_written': op.bytes_written,
+                'rows_read': op.rows_read,
+                'bytes_read_per_call': round(op.bytes_read / op.calls),
+                'rows_read_per_call': round(op.rows_read / op.calls, 1),
+            }
+    return {'since': time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(_started)),
+            'pid': os.getpid(), 'operations': ops}
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+def dump(path=None):
+    """Write snapshot() as JSON (atomically) to path or LIBRARY_INSTRUMENT_FILE"""
+    path = path or DUMP_FILE
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(snapshot(), f, indent=1)
+    os.replace(tmp, path)
+
+
+_dumper = None
+
+
+def _start_dumper():
+    global _dumper
+    if _dumper is not None:
+        return
+
+    def run():
+        while True:
+            time.sleep(DUMP_INTERVAL)
+            _dump_quietly()
+
+    _dumper = threading.Thread(target=run, name="instrumentation-dump", daemon=True)
+    _dumper.start()
+    atexit.register(_dump_quietly)
+
+
+def _dump_quietly():
+    try:
+        dump()
+    except OSError:
+        pass  # try again next interval
@@ -0,0 +1,114 @@
+"""
+journal.py - Group-commit append writer for the transaction log
+Borrow and return rows are appended through a Journal that keeps the log
+file open and makes rows durable with one fsync() per group of rows:
+
+    ticket, end = journal.append(text)   # under the log's exclusive lock
+    ...                                  # release the locks
+    journal.wait(ticket)                 # returns once the row is on disk
+
+The first caller to wait becomes the leader of a group. It waits up to
+LIBRARY_JOURNAL_DELAY_MS (default 0) for more rows, syncs once and wakes
+every caller that sync covered. Rows appended while a sync is running go
+into the next group, so bursts are batched even with no delay.
+"""
+
+import locale
+import os
+import threading
+
+import instrumentation
+
+DELAY = float(os.environ.get("LIBRARY_JOURNAL_DELAY_MS", "0")) / 1000
+
+# Same encoding as open() without an explicit one, which the readers use
+ENCODING = locale.getpreferredencoding(False)
+
+
+class Journal:
+    def __init__(self, path, delay=DELAY):
+        self.path = path
+        self.delay = delay   # seconds a leader waits for more rows before syncing
+        self.fd = None
+        self.ino = None
+        self.written = 0     # tickets handed out
+        self.durable = 0     # highest ticket known to be on disk
+        self.groups = 0      # fsync() calls made for waiters
+        self.syncing = False
+        self._cond = threading.Condition()
+        self._fd_lock = threading.Lock()  # fsync vs. swapping the descriptor
+
+    # ---------- writing ----------
+
+    def append(self, text, header=''):
+        """
+        Write text (with header first if the file is empty) to the end of the
+        log. Returns (ticket, end offset). Callers hold the log's exclusive lock.
+        """
+        fd = self._open()
+        if header and os.fstat(fd).st_size == 0:
+            text = header + text
+        data = text.encode(ENCODING)
+        instrumentation.count_write(len(data))
+        while data:
+            data = data[os.write(fd, data):]
+        end = os.lseek(fd, 0, os.SEEK_CUR)
+        with self._cond:
+            self.written += 1
+            return self.written, end
+
+    def _open(self):
+        """The descriptor of the current file at path (reopened after a rotation)"""
+        try:
+            ino = os.stat(self.path).st_ino
+        except OSError:
+            ino = None
+        if self.fd is not None and ino == self.ino:
+            return self.fd
+
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_BINARY', 0)
+        fd = os.open(self.path, flags, 0o666)
+        with self._fd_lock:
+            old, self.fd, self.ino = self.fd, fd, os.fstat(fd).st_ino
+            if old is not None:
+                os.fsync(old)  # rows still waiting for a sync were written there
+                os.close(old)
+        return fd
+
+    # ---------- durability ----------
+
+    def wait(self, ticket):
+        """Block until the row(s) appended under ticket are on disk"""
+        with self._cond:
+            while self.durable < ticket:
+                if self.syncing:
+                    self._cond.wait()
+                    continue
+                self.syncing = True
+                try:
+                    if self.delay:
+                        self._cond.wait(self.delay)  # let more rows join the group
+                    target = self.written
+                    self._cond.release()
+                    try:
+                        with self._fd_lock:
+                            os.fsync(self.fd)
+                    finally:
+                        self._cond.acquire()
+                    self.durable = max(self.durable, target)
+                    self.groups += 1
+                finally:
+                    self.syncing = False
+                    self._cond.notify_all()
+
+    def close(self):
+        """Sync anything still pending and close the file"""
+        with self._fd_lock:
+            if self.fd is not None:
+                os.fsync(self.fd)
+                os.close(self.fd)
+                self.fd = None
+                self.ino = None
+        with self._cond:
+            self.durable = self.written
+            self._cond.notify_all()
@@ -0,0 +1,558 @@
+"""
+log_segments.py - Monthly segments for the transaction log
+transactions.csv stays the active segment that new rows are appended to.
+Once a new month starts, the rows of earlier months move into one
+gzip-compressed CSV per month in the archive folder, and manifest.json lists
+each segment's file, month, first/last date and row count so readers can skip
+segments outside the dates they ask for.
+
+Rotation order (a crash at any point loses nothing):
+    1. write the compressed month segments
+    2. write the trimmed active segment to transactions.csv.rotated
+    3. write the manifest naming the new segments and the active file they
+       were cut from - this is the commit point
+    4. replace transactions.csv with the trimmed copy
+open() finishes step 4 if the process died between 3 and 4.
+
+Rows appended to the active segment carry a CRC32 of their fields in a
+trailing 'crc' column. After a crash, repair_tail() cuts a torn or corrupt
+end off the file by reading backwards only as far as the last good row.
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import zlib
+from itertools import islice
+
+import file_format
+import instrumentation
+
+MANIFEST = 'manifest.json'
+
+
+def month_of(t):
+    """'YYYY-MM' of a transaction row"""
+    return t['date'][:7]
+
+
+def open_rows(path):
+    """Text handle for a plain or gzip-compressed CSV"""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', newline='')
+    return open(path, 'r', newline='')
+
+
+def _identity(path):
+    """[inode, size] of path, as the manifest's 'replaces' records it"""
+    stamp = file_format.stamp(path)
+    return list(stamp[:2]) if stamp else None
+
+
+class SegmentedLog:
+    def __init__(self, active_path, archive_dir, fieldnames):
+        self.active_path = active_path
+        self.archive_dir = archive_dir
+        self.fieldnames = fieldnames
+        self.manifest_path = os.path.join(archive_dir, MANIFEST)
+        self.segments = []       # manifest entries, oldest first
+        self.active_month = None  # month of the first row in the active segment
+
+    def open(self):
+        """Load the manifest and finish a rotation interrupted by a crash"""
+        manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+        self.segments = manifest.get('segments', [])
+
+        rotated = self.active_path + '.rotated'
+        if os.path.exists(rotated):
+            if manifest.get('replaces') and _identity(self.active_path) == manifest['replaces']:
+                os.replace(rotated, self.active_path)
+            else:
+                os.remove(rotated)  # never committed
+
+        self.active_month = None
+        if os.path.exists(self.active_path):
+            with open(self.active_path, 'r', newline='') as f:
+                for t in csv.DictReader(f):
+                    self.active_month = month_of(t)
+                    break
+
+    # ---------- appends ----------
+
+    def needs_rotation(self, month):
+        """True once a row for a later month than the active segment's arrives"""
+        return self.active_month is not None and month > self.active_month
+
+    def appended(self, t):
+        if self.active_month is None:
+            self.active_month = month_of(t)
+
+    def rotate(self, keep_from):
+        """
+        Move the rows dated before keep_from ('YYYY-MM') out of the active
+        segment into compressed monthly segments.
+        """
+        with open(self.active_path, 'r', newline='') as f:
+            f.readline()  # header; older logs lack the trailing columns
+            rows = list(csv.DictReader(f, fieldnames=self.fieldnames))
+        instrumentation.count_read(os.path.getsize(self.active_path), len(rows))
+
+        closed = {}
+        keep = []
+        for t in rows:
+            month = month_of(t)
+            if month < keep_from:
+                closed.setdefault(month, []).append(t)
+            else:
+                keep.append(t)
+        if not closed:
+            self.active_month = month_of(keep[0]) if keep else None
+            return
+
+        os.makedirs(self.archive_dir, exist_ok=True)
+        names = {s['file'] for s in self.segments}
+        added = []
+        for month in sorted(closed):
+            month_rows = closed[month]
+            # A month can only repeat if the clock went backwards
+            name = f"{month}.csv.gz"
+            n = 1
+            while name in names:
+                name = f"{month}.{n}.csv.gz"
+                n += 1
+            names.add(name)
+
+            path = os.path.join(self.archive_dir, name)
+            with gzip.open(path + '.tmp', 'wt', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=self.fieldnames)
+                writer.writeheader()
+                writer.writerows(month_rows)
+            os.replace(path + '.tmp', path)
+            instrumentation.count_write(os.path.getsize(path))
+
+            dates = [t['date'] for t in month_rows]
+            added.append({'file': name, 'month': month, 'first': min(dates),
+                          'last': max(dates), 'count': len(month_rows)})
+
+        rotated = self.active_path + '.rotated'
+        with open(rotated, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=self.fieldnames)
+            writer.writeheader()
+            writer.writerows(keep)
+            instrumentation.count_write(f.tell())
+
+        self._write_manifest(self.segments + added, replaces=_identity(self.active_path))
+        self.segments = self.segments + added
+        os.replace(rotated, self.active_path)
+        self.active_month = month_of(keep[0]) if keep else None
+
+    def _write_manifest(self, segments, replaces=None):
+        tmp = self.manifest_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'segments': segments, 'replaces': replaces}, f, indent=1)
+        os.replace(tmp, self.manifest_path)
+
+    # ---------- reads ----------
+
+    def segment_paths(self, since=None, until=None):
+        """Archived segments that may hold rows dated within [since, until], oldest first"""
+        for s in self.segments:
+            if since and s['last'] < since:
+                continue
+            if until and s['first'][:len(until)] > until:
+                continue
+            yield os.path.join(self.archive_dir, s['file'])
+
+    def archived_rows(self, skip=0):
+        """Stream the archived rows after the first skip, oldest segment first"""
+        for s, path in zip(self.segments, self.segment_paths()):
+            if skip >= s['count']:
+                skip -= s['count']  # whole segment skipped unread
+                continue
+            rows = 0
+            with open_rows(path) as f:
+                for t in islice(csv.DictReader(f), skip, None):
+                    rows += 1
+                    yield t
+            skip = 0
+            instrumentation.count_read(os.path.getsize(path), rows)
+
+
+# ==========================
+# Active segment: paging & tail
+# ==========================
+INDEX_EVERY = 1000
+
+
+class RowIndex:
+    """
+    Sparse byte-offset index over the active segment: offsets[k] is where
+    data row k * every starts. Transaction fields never contain newlines, so
+    one line is one row; blank lines are not rows, as for csv.DictReader.
+    refresh() only scans what was appended since.
+    """
+
+    def __init__(self, every=INDEX_EVERY):
+        self.every = every
+        self._reset()
+
+    def _reset(self):
+        self.offsets = []
+        self.rows = 0
+        self.end = 0      # byte offset up to which rows are indexed
+        self.inode = None
+
+    def refresh(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._reset()
+            return
+        if st.st_ino != self.inode or st.st_size < self.end:
+            self._reset()  # replaced (rotation) or truncated
+            self.inode = st.st_ino
+
+        with open(path, 'rb') as f:
+            if self.end == 0:
+                f.readline()  # header
+                self.end = f.tell()
+            f.seek(self.end)
+            pos = start = self.end
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # row still being written
+                if not line.strip():
+                    pos += len(line)
+                    continue
+                if self.rows % self.every == 0:
+                    self.offsets.append(pos)
+                pos += len(line)
+                self.rows += 1
+            self.end = pos
+        instrumentation.count_read(pos - start)
+
+    def read(self, path, fieldnames, start, count):
+        """Rows [start, start + count) of the active segment"""
+        if count <= 0 or start >= self.rows:
+            return []
+        block = start // self.every
+        rows = []
+        with open(path, 'rb') as raw:
+            raw.seek(self.offsets[block])
+            text = io.TextIOWrapper(raw, newline='')  # closes raw when collected
+            reader = _dict_rows(csv.reader(text), fieldnames)
+            parsed = 0
+            for i, t in enumerate(reader, start=block * self.every):
+                if i >= start + count or i >= self.rows:
+                    break
+                parsed += 1
+                if i >= start:
+                    rows.append(t)
+            instrumentation.count_read(raw.tell() - self.offsets[block], parsed)
+        return rows
+
+    def pick(self, path, fieldnames, numbers):
+        """Rows numbered numbers (ascending) of the active segment, each found from its block's offset"""
+        lines = []
+        read = 0
+        with open(path, 'rb') as f:
+            row = None  # number of the row starting at f's position
+            for n in numbers:
+                if n >= self.rows:
+                    break
+                block = n // self.every
+                if row is None or not block * self.every <= row <= n:
+                    f.seek(self.offsets[block])
+                    row = block * self.every
+                while row <= n:
+                    line = f.readline()
+                    if not line:
+                        break
+                    read += len(line)
+                    if not line.strip():
+                        continue
+                    if row == n:
+                        lines.append(line)
+                    row += 1
+        rows = list(_dict_rows(csv.reader(io.StringIO(b''.join(lines).decode(), newline='')), fieldnames))
+        instrumentation.count_read(read, len(rows))
+        return rows
+
+
+# ==========================
+# Active segment: checksums & tail repair
+# ==========================
+def row_checksum(values):
+    """CRC32 of a row's field values, as stored in its 'crc' column"""
+    return format(zlib.crc32(','.join(values).encode()), '08x')
+
+
+def line_values(line):
+    """The CSV values of one raw line, or None if it does not decode or parse"""
+    try:
+        return next(csv.reader([line.decode()]), [])
+    except (UnicodeDecodeError, csv.Error):
+        return None
+
+
+def valid_row(line, fields):
+    """
+    True if a raw line is a whole row: fields plus a matching checksum, or
+    just the fields (rows written before checksums, or blank checksums).
+    """
+    values = line_values(line)
+    if values is None:
+        return False
+    if not values or len(values) == len(fields):
+        return True  # blank line, or no checksum
+    return len(values) == len(fields) + 1 and values[-1] in ('', row_checksum(values[:-1]))
+
+
+def repair_tail(path, valid=None, finish=None, block_size=4096):
+    """
+    Truncate path after its last good line and return the bytes removed.
+    A line is good if it ends in a newline and valid(line) (if given) is
+    true; the first line (the header) only needs the newline. A last line
+    without its newline is a torn write, unless finish(line) accepts it
+    (a hand-edited file may just lack the final newline): then the newline
+    is added instead. Reads backwards from the end, so the cost depends on
+    the damage, not the file size.
+    """
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return 0
+    if size == 0:
+        return 0
+    with open(path, 'r+b') as f:
+        f.seek(size - 1)
+        if valid is None and finish is None and f.read(1) == b'\n':
+            return 0  # the common case: one byte read
+
+        pos = size
+        data = b''
+        keep = None
+        while keep is None:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+            keep = _good_end(data, pos == 0, valid)
+        instrumentation.count_read(len(data))
+
+        torn = data[data.rfind(b'\n') + 1:]
+        if torn and finish is not None and keep == len(data) - len(torn) and finish(torn):
+            f.seek(size)
+            f.write(b'\r\n')
+            return 0
+        if pos + keep < size:
+            f.truncate(pos + keep)
+            os.fsync(f.fileno())
+    return size - (pos + keep)
+
+
+def _good_end(data, at_start, valid):
+    """Length of data up to its last good line; None if that needs more of the file"""
+    end = data.rfind(b'\n') + 1
+    while end > 0:
+        start = data.rfind(b'\n', 0, end - 1) + 1
+        if start == 0 and not at_start:
+            return None  # the line may begin before data
+        if start == 0 or valid is None or valid(data[start:end]):
+            return end
+        end = start
+    return 0 if at_start else None
+
+
+def _dict_rows(reader, fieldnames):
+    """Dicts of the given fields for each non-blank row; later columns (the checksum) are left out"""
+    return (dict(zip(fieldnames, row)) for row in reader if row)
+
+
+def tail_rows(path, n, fieldnames, block_size=64 * 1024):
+    """The last n data rows of a CSV file, oldest first, reading backwards from the end"""
+    if n <= 0 or not os.path.exists(path):
+        return []
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        data = b''
+        # n rows need n + 1 line breaks before them, unless the header is reached
+        while pos > 0 and data.count(b'\n') <= n + 1:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+
+    # The first line is the header (pos == 0) or a partial row; the last
+    # piece is empty, or a row still being written
+    lines = data.split(b'\n')[1:-1]
+    lines = [line for line in lines if line.strip()][-n:]
+    rows = list(_dict_rows(csv.reader(io.StringIO(b'\n'.join(lines).decode() + '\n', newline='')), fieldnames))
+    instrumentation.count_read(len(data), len(rows))
+    return rows
+
+
+# ==========================
+# Date ranges
+# ==========================
+# Rows are appended in date order, so a date range is found by binary
+# search. Bounds are prefixes of 'YYYY-MM-DD HH:MM:SS' and both are
+# inclusive: until '2024-05-03' takes in the whole day.
+
+def _count_while(rows, pred):
+    """Number of leading rows for which pred holds (pred must hold for a prefix)"""
+    lo, hi = 0, len(rows)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if pred(rows[mid]):
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def slice_between(rows, since=None, until=None):
+    """The rows of a date-ordered list dated within [since, until]"""
+    lo = _count_while(rows, lambda t: t['date'] < since) if since else 0
+    hi = _count_while(rows, lambda t: t['date'][:len(until)] <= until) if until else len(rows)
+    return rows[lo:max(lo, hi)]
+
+
+def rows_between(path, fieldnames, since=None, until=None):
+    """
+    Rows of a date-ordered CSV file dated within [since, until]: a binary
+    search over byte offsets (each probe resyncs to the next line start)
+    finds the first one, then rows are read until the first one past until.
+    Reads O(log n) probe lines plus the matching rows.
+    """
+    if not os.path.exists(path):
+        return []
+    date_at = fieldnames.index('date')
+
+    with open(path, 'rb') as raw:
+        raw.readline()  # header
+        first = raw.tell()
+        size = raw.seek(0, os.SEEK_END)
+        probed = 0
+
+        def line_from(pos):
+            """(offset, line) of the first line starting at or after pos"""
+            if pos > first:
+                raw.seek(pos - 1)
+                raw.readline()  # finish the line that pos - 1 is in
+            else:
+                raw.seek(first)
+            return raw.tell(), raw.readline()
+
+        def row_from(pos):
+            """(offset, date) of the first whole row at or after pos; date None at the end"""
+            nonlocal probed
+            offset, line = line_from(pos)
+            while line:
+                probed += len(line)
+                values = line_values(line) if line.endswith(b'\n') else None
+                if values and len(values) > date_at:
+                    return offset, values[date_at]
+                offset, line = raw.tell(), raw.readline()  # blank or torn: try the next line
+            return offset, None
+
+        lo, hi = first, size
+        while since and lo < hi:
+            mid = (lo + hi) // 2
+            offset, date = row_from(mid)
+            if date is not None and date < since:
+                lo = offset + 1  # no row starts in (mid, offset]
+            else:
+                hi = mid
+
+        start, _ = line_from(lo)
+        raw.seek(start)
+        text = io.TextIOWrapper(raw, newline='')  # closes raw when collected
+        rows = []
+        for t in _dict_rows(csv.reader(text), fieldnames):
+            date = t.get('date')
+            if date is None:
+                continue  # torn row
+            if until and date[:len(until)] > until:
+                break
+            if since and date < since:
+                continue
+            rows.append(t)
+        instrumentation.count_read(probed + raw.tell() - start, len(rows))
+    return rows
+
+
+
+# ==========================
+# Rows by position
+# ==========================
+# Row numbers count data rows after the header and leave out blank lines,
+# like csv.DictReader and the manifest counts do.
+
+def rows_after(path, fieldnames, offset=0, skip=0):
+    """
+    (rows, end) for the active segment: the complete rows from byte offset
+    on (0: the first row), less the first skip of them, and the offset
+    after the last one. A row still being written is left for next time.
+    """
+    if not os.path.exists(path):
+        return [], 0
+    lines = []
+    with open(path, 'rb') as f:
+        if offset == 0:
+            f.readline()  # header
+            offset = f.tell()
+        f.seek(offset)
+        end = offset
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            end += len(line)
+            if not line.strip():
+                continue
+            if skip:
+                skip -= 1
+            else:
+                lines.append(line)
+    rows = list(_dict_rows(csv.reader(io.StringIO(b''.join(lines).decode(), newline='')), fieldnames))
+    instrumentation.count_read(end - offset, len(rows))
+    return rows, end
+
+
+def line_before(path, offset, block_size=4096):
+    """The line of path that ends at byte offset (b'' if there is none)"""
+    with open(path, 'rb') as f:
+        start = max(0, offset - block_size)
+        f.seek(start)
+        data = f.read(offset - start)
+    instrumentation.count_read(len(data))
+    return data[data.rfind(b'\n', 0, len(data) - 1) + 1:]
+
+
+def pick_rows(path, numbers, fieldnames):
+    """The rows numbered numbers (ascending) of a plain or gzip-compressed CSV"""
+    if not numbers or not os.path.exists(path):
+        return []
+    wanted = iter(numbers)
+    n = next(wanted)
+    lines = []
+    with open_rows(path) as f:
+        f.readline()  # header
+        i = 0
+        for line in f:
+            if not line.strip():
+                continue
+            if i == n:
+                lines.append(line)
+                n = next(wanted, None)
+                if n is None:
+                    break
+            i += 1
+    rows = list(_dict_rows(csv.reader(lines), fieldnames))
+    instrumentation.count_read(sum(map(len, lines)), len(rows))
+    return rows
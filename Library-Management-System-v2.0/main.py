@@ -1,6 +1,29 @@
 import csv
+import gc
+import io
+import json
 import os
-from datetime import datetime
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import date, datetime
+from itertools import count
+from operator import attrgetter
+from sys import intern
+
+import file_format
+import file_lock
+import instrumentation
+from availability import AvailabilityBitmap
+from due_queue import DueQueue, day_ordinal
+from history_index import SAVE_EVERY, HistoryIndex, row_key
+from journal import Journal
+from log_segments import (RowIndex, SegmentedLog, line_before, line_values, month_of, pick_rows, repair_tail,
+                          row_checksum, rows_after, rows_between, slice_between, tail_rows, valid_row)
+from read_cache import ReadCache
+from records import BookRecord, LoanRecord, MemberRecord, TransactionRecord
+from search_index import SearchIndex
+from snapshot import Snapshot
 
 # ==========================
 # Paths & folders
@@ -9,9 +32,34 @@ DATA_DIR = "data"
 BOOKS_FILE = os.path.join(DATA_DIR, "books.csv")
 MEMBERS_FILE = os.path.join(DATA_DIR, "members.csv")
 TRANSACTIONS_FILE = os.path.join(DATA_DIR, "transactions.csv")
+LOG_ARCHIVE_DIR = os.path.join(DATA_DIR, "log")
+OPEN_LOANS_FILE = os.path.join(DATA_DIR, "open_loans.csv")
+CHECKPOINT_FILE = os.path.join(DATA_DIR, "open_loans.checkpoint")
+AVAILABILITY_FILE = os.path.join(DATA_DIR, "books.avail")
+SNAPSHOT_FILE = os.path.join(DATA_DIR, "library.snap")
+HISTORY_FILE = os.path.join(DATA_DIR, "history.idx")
+
+TRANSACTION_FIELDS = ['member_id', 'isbn', 'action', 'date', 'due_date']
+LOAN_FIELDS = ['member_id', 'isbn', 'borrow_date', 'due_date']
+# transactions.csv columns: the fields plus a checksum of them (see log_segments.py)
+LOG_FIELDS = TRANSACTION_FIELDS + ['crc']
+TRANSACTION_HEADER = ','.join(LOG_FIELDS) + '\r\n'  # as csv.DictWriter.writeheader() writes it
+
+# Transactions appended between two open-loan checkpoints
+CHECKPOINT_INTERVAL = 500
+
+# How often the shared store checks whether another desk changed the files
+STALE_CHECK_SECONDS = 0.5
+
+# Storage backend: 'csv' (default) or 'sqlite'
+STORAGE_BACKEND = os.environ.get("LIBRARY_BACKEND", "csv")
+SQLITE_FILE = os.path.join(DATA_DIR, "library.db")
 
 os.makedirs(DATA_DIR, exist_ok=True)
 
+# Parsed CSV rows shared by every reader; writers below invalidate their file
+read_cache = ReadCache()
+
 # ==========================
 # 📚 Book Class
 # ==========================
@@ -25,29 +73,21 @@ class Book:
         self.available = available
 
     def append_book(self):
-        books = Book.load_books()
+        store = LibraryStore.get()
 
-        for b in books:
-            if b['isbn'] == self.isbn:
-                raise Exception("Book with this ISBN already exists")
+        if self.isbn in store.books:
+            raise Exception("Book with this ISBN already exists")
 
-        with open(BOOKS_FILE, 'a', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=Book.fieldnames)
-            if f.tell() == 0:
-                writer.writeheader()
-            writer.writerow({
-                'title': self.title,
-                'author': self.author,
-                'isbn': self.isbn,
-                'available': str(self.available)
-            })
+        store.add_book({
+            'title': self.title,
+            'author': self.author,
+            'isbn': self.isbn,
+            'available': str(self.available)
+        })
 
     @staticmethod
     def load_books():
-        if not os.path.exists(BOOKS_FILE):
-            return []
-        with open(BOOKS_FILE, 'r', newline='') as f:
-            return list(csv.DictReader(f))
+        return get_backend().load_books()
 
     @staticmethod
     def is_valid_isbn(isbn):
@@ -66,24 +106,16 @@ class Member:
         self.email = email
 
     def append_member(self):
-        members = Member.load_members()
+        store = LibraryStore.get()
 
-        for m in members:
-            if m['member_id'] == self.member_id:
-                raise Exception("Member already exists")
+        if self.member_id in store.members:
+            raise Exception("Member already exists")
 
-        with open(MEMBERS_FILE, 'a', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=Member.fieldnames)
-            if f.tell() == 0:
-                writer.writeheader()
-            writer.writerow(vars(self))
+        store.add_member(dict(vars(self)))
 
     @staticmethod
     def load_members():
-        if not os.path.exists(MEMBERS_FILE):
-            return []
-        with open(MEMBERS_FILE, 'r', newline='') as f:
-            return list(csv.DictReader(f))
+        return get_backend().load_members()
 
 # ==========================
 # 🔐 User Class (for login)
@@ -99,46 +131,35 @@ class User:
         self.name = name
 
     def append_user(self):
-        users = User.load_users()
+        store = LibraryStore.get()
 
-        for u in users:
-            if u['username'] == self.username:
-                raise Exception("Username already exists")
+        if self.username in store.users:
+            raise Exception("Username already exists")
 
-        with open(User.USERS_FILE, 'a', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=User.fieldnames)
-            if f.tell() == 0:
-                writer.writeheader()
-            writer.writerow(vars(self))
+        store.add_user(dict(vars(self)))
 
     @staticmethod
     def load_users():
-        if not os.path.exists(User.USERS_FILE):
-            return []
-        with open(User.USERS_FILE, 'r', newline='') as f:
-            return list(csv.DictReader(f))
+        return get_backend().load_users()
 
     @staticmethod
     def authenticate(username, password):
         """Verify login credentials"""
-        users = User.load_users()
+        user = LibraryStore.get().users.get(username)
         
-        for user in users:
-            if user['username'] == username and user['password'] == password:
-                return {
-                    'username': user['username'],
-                    'role': user['role'],
-                    'name': user['name']
-                }
+        if user and user['password'] == password:
+            return {
+                'username': user['username'],
+                'role': user['role'],
+                'name': user['name']
+            }
         
         return None
 
     @staticmethod
     def create_default_users():
         """Create default users if none exist"""
-        users = User.load_users()
-        
-        if not users:
+        if not LibraryStore.get().users:
             # Create default admin
             admin = User('admin', 'admin123', 'admin', 'Administrator')
             admin.append_user()
@@ -151,6 +172,864 @@ class User:
             member = User('member', 'mem123', 'member', 'Member User')
             member.append_user()
 
+# ==========================
+# 💾 Storage Backends
+# ==========================
+class StorageBackend:
+    """
+    Persistence interface used by LibraryStore.
+    Mutations receive the changed row and, where a backend has to rewrite a
+    whole dataset (CSV), the full collection it belongs to.
+    """
+
+    def load_books(self):
+        """Book rows as BookRecords"""
+        raise NotImplementedError
+
+    def load_members(self):
+        """Member rows as MemberRecords"""
+        raise NotImplementedError
+
+    def load_users(self):
+        raise NotImplementedError
+
+    def load_transactions(self, since=None, until=None):
+        """Transactions dated within [since, until] ('YYYY-MM-DD', inclusive), oldest first"""
+        raise NotImplementedError
+
+    def transactions_between(self, since=None, until=None):
+        """
+        Transactions dated within [since, until], oldest first. Bounds are
+        prefixes of 'YYYY-MM-DD HH:MM:SS' and both are inclusive.
+        """
+        return slice_between(self.load_transactions(), since, until)
+
+    def history(self, field, key):
+        """Transactions whose field ('isbn' or 'member_id') is key, oldest first"""
+        return [t for t in self.load_transactions() if t[field] == key]
+
+    def rebuild_history(self):
+        """Rebuild the index that history() reads from, if the backend keeps one"""
+        pass
+
+    def transaction_page(self, offset, limit):
+        """
+        (rows, total): transactions [offset, offset + limit) in log order and
+        the size of the log. offset None means the last page.
+        """
+        rows = self.load_transactions()
+        if offset is None:
+            offset = max(0, len(rows) - limit)
+        return rows[offset:offset + limit if limit is not None else None], len(rows)
+
+    def recent_transactions(self, n):
+        """The newest n transactions, newest first"""
+        return self.load_transactions()[-n:][::-1] if n > 0 else []
+
+    def add_book(self, book):
+        raise NotImplementedError
+
+    def add_books(self, books):
+        """Persist many new books in one write"""
+        for book in books:
+            self.add_book(book)
+
+    def update_book(self, book, books):
+        raise NotImplementedError
+
+    def update_availability(self, book, books):
+        """Persist a change to book['available'] only"""
+        self.update_book(book, books)
+
+    def delete_book(self, isbn, books):
+        raise NotImplementedError
+
+    def add_member(self, member):
+        raise NotImplementedError
+
+    def add_members(self, members):
+        """Persist many new members in one write"""
+        for member in members:
+            self.add_member(member)
+
+    def update_member(self, member, members):
+        raise NotImplementedError
+
+    def delete_member(self, member_id, members):
+        raise NotImplementedError
+
+    def add_user(self, user):
+        raise NotImplementedError
+
+    def restore_loans(self, store):
+        """Fill store.loans and the transaction counters"""
+        raise NotImplementedError
+
+    def log_transaction(self, t, store):
+        """Persist one transaction; store has already applied it"""
+        raise NotImplementedError
+
+    def log_transactions(self, transactions, store):
+        for t in transactions:
+            self.log_transaction(t, store)
+
+    def commit_batch(self, books, transactions, all_books, store):
+        """Persist the availability of books together with their log rows"""
+        for book in books:
+            self.update_availability(book, all_books)
+        self.log_transactions(transactions, store)
+
+    def load_stats(self):
+        """Dashboard counters without loading the data, or None if unknown"""
+        return None
+
+    def is_stale(self):
+        """True if another process changed the data since this one loaded it"""
+        return False
+
+    def close(self):
+        pass
+
+
+class CsvBackend(StorageBackend):
+    """
+    The original CSV files in DATA_DIR.
+    Book availability lives in a memory-mapped bitmap (books.avail) indexed by
+    each book's row slot, so borrow/return never rewrite books.csv.
+    transactions.csv only holds the current month; earlier months are
+    compressed segments in LOG_ARCHIVE_DIR. Borrow and return rows are
+    appended through a group-commit journal (journal.py) and are on disk
+    before the call returns.
+
+    Books, members and the open-loan table are also kept in a binary snapshot
+    (library.snap, see snapshot.py) that startup reads instead of parsing the
+    CSVs, for as long as each CSV is unchanged. The rows of one book or one
+    member are found through history.idx (see history_index.py).
+
+    Every dataset file is read under a shared lock and written under an
+    exclusive one (see file_lock.py). Writes are refused when the file was
+    changed by another desk since this process last saw it, so a stale
+    in-memory copy never overwrites someone else's rows.
+    """
+
+    def __init__(self):
+        self.log_offset = 0  # end of the log already folded into the loans table
+        self.pending = 0     # transactions logged since the last checkpoint
+        self.bitmap = AvailabilityBitmap(AVAILABILITY_FILE)
+        self._slots = {}     # isbn -> row slot in books.csv / books.avail
+        self._slot_isbns = None  # ISBNs in slot order, until _slots is built from them
+        self.log = SegmentedLog(TRANSACTIONS_FILE, LOG_ARCHIVE_DIR, LOG_FIELDS)
+        self.log_index = RowIndex()  # sparse row -> byte offset index of the active log
+        self.journal = Journal(TRANSACTIONS_FILE)
+        self.seen = {}       # dataset path -> stamp as this process last read or wrote it
+        self.snapshot = Snapshot(SNAPSHOT_FILE)
+        self.history_index = HistoryIndex(HISTORY_FILE)  # read on the first history() call
+        self.checked = 0.0   # time.monotonic() of the last is_stale() scan
+
+    @property
+    def slots(self):
+        """isbn -> row slot, built on first use so startup skips it"""
+        if self._slot_isbns is not None:
+            self._slots = dict(zip(self._slot_isbns, count()))
+            self._slot_isbns = None
+        return self._slots
+
+    def _read(self, path, record=None):
+        with file_lock.shared(path):
+            rows = read_cache.read(path, record)
+            self.seen[path] = file_format.stamp(path)
+        return rows
+
+    @contextmanager
+    def _writing(self, path):
+        """Exclusive lock on a dataset, refused if another desk changed it meanwhile"""
+        with file_lock.exclusive(path):
+            if path in self.seen and file_format.stamp(path) != self.seen[path]:
+                read_cache.invalidate(path)
+                LibraryStore.reset()
+                raise Exception(f"{os.path.basename(path)} was changed at another desk. "
+                                "The data has been reloaded, please try again.")
+            try:
+                yield
+            finally:
+                read_cache.invalidate(path)
+                self.seen[path] = file_format.stamp(path)
+
+    def is_stale(self):
+        # Writes re-check their own file, so a short delay here is harmless
+        now = time.monotonic()
+        if now - self.checked < STALE_CHECK_SECONDS:
+            return False
+        self.checked = now
+        return any(file_format.stamp(path) != stamp for path, stamp in self.seen.items())
+
+    def _append(self, path, fieldnames, *rows):
+        with self._writing(path):
+            self._repair(path, fieldnames)
+            with open(path, 'a', newline='', buffering=1024 * 1024) as f:
+                start = f.tell()
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                if start == 0:
+                    writer.writeheader()
+                writer.writerows(rows)
+                instrumentation.count_write(f.tell() - start)
+                return f.tell()
+
+    @staticmethod
+    def _repair(path, fieldnames):
+        """
+        Cut a row torn by a crash off the end of a dataset, so it is neither
+        loaded nor continued by the next append. A complete last row that
+        only lacks its newline (hand-edited file) gets the newline instead.
+        """
+        if repair_tail(path, finish=lambda line: len(line_values(line) or ()) == len(fieldnames)):
+            read_cache.invalidate(path)
+
+    def _read_snapshot(self, path):
+        """Columns of path from the snapshot, or None if it has no current copy"""
+        stamp = file_format.stamp(path)
+        columns = self.snapshot.columns(path, stamp)
+        if columns is None:
+            return None
+        self.seen[path] = stamp
+        return columns
+
+    def load_books(self):
+        # Exclusive: attaching may rebuild the bitmap
+        with file_lock.exclusive(BOOKS_FILE):
+            self._repair(BOOKS_FILE, Book.fieldnames)
+            columns = self._read_snapshot(BOOKS_FILE)
+            available = None if columns is None else self.bitmap.availability(columns['isbn'])
+            if available is not None:
+                columns['is_available'] = available
+                books = BookRecord.from_columns(columns)
+                self._slot_isbns = columns['isbn']
+            else:
+                books = self._read(BOOKS_FILE, BookRecord)
+                self.bitmap.attach(books)
+                self.snapshot.store(BOOKS_FILE, self.seen[BOOKS_FILE], BookRecord, books)
+                self._slot_isbns = list(map(attrgetter('isbn'), books))
+        return books
+
+    def load_members(self):
+        with file_lock.shared(MEMBERS_FILE):
+            columns = self._read_snapshot(MEMBERS_FILE)
+            if columns is not None:
+                return MemberRecord.from_columns(columns)
+            members = self._read(MEMBERS_FILE, MemberRecord)
+            self.snapshot.store(MEMBERS_FILE, self.seen[MEMBERS_FILE], MemberRecord, members)
+        return members
+
+    def load_users(self):
+        return self._read(User.USERS_FILE)
+
+    def load_transactions(self, since=None, until=None):
+        if since or until:
+            return self.transactions_between(since, until)
+        rows = []
+        with file_lock.shared(TRANSACTIONS_FILE):
+            self.log.open()  # another desk may have rotated the log
+            for path in self.log.segment_paths():
+                rows.extend(read_cache.read(path, TransactionRecord))
+            rows.extend(read_cache.read(TRANSACTIONS_FILE, TransactionRecord))
+        return rows
+
+    def transactions_between(self, since=None, until=None):
+        """
+        Archived months are picked by their manifest dates and binary-searched
+        in their cached rows; the active log is binary-searched by byte offset.
+        """
+        rows = []
+        with file_lock.shared(TRANSACTIONS_FILE):
+            self.log.open()
+            for path in self.log.segment_paths(since, until):
+                rows.extend(slice_between(read_cache.read(path, TransactionRecord), since, until))
+            rows.extend(rows_between(TRANSACTIONS_FILE, TRANSACTION_FIELDS, since, until))
+        return rows
+
+    def history(self, field, key):
+        with file_lock.shared(TRANSACTIONS_FILE):
+            self.log.open()
+            history = self._caught_up_history()
+            return self._rows_at(history.lookup(field, key))
+
+    def rebuild_history(self):
+        with file_lock.shared(TRANSACTIONS_FILE):
+            self.log.open()
+            self.history_index.loaded = True
+            self.history_index.clear()
+            self._caught_up_history()
+            self.history_index.save()
+
+    def _caught_up_history(self):
+        """
+        The history index with every complete log row in it. While the
+        last indexed row still ends where it did in the active file, rows
+        are read from there on. Otherwise (rotation, truncation, a file
+        rewritten in place) they are found by position, once the last
+        indexed row is confirmed to be unchanged.
+        """
+        history = self.history_index
+        if not history.loaded:
+            history.load()
+        try:
+            st = os.stat(TRANSACTIONS_FILE)
+        except OSError:
+            st = None
+        if (st is not None and st.st_ino == history.ino and history.rows and history.end <= st.st_size
+                and self._row_key(line_before(TRANSACTIONS_FILE, history.end)) == history.last):
+            rows, history.end = rows_after(TRANSACTIONS_FILE, TRANSACTION_FIELDS, history.end)
+            history.add(rows)
+        else:
+            if history.rows and [row_key(t) for t in self._rows_at([history.rows - 1])] != [history.last]:
+                history.clear()  # the log was rewritten: index it again
+            archived = sum(s['count'] for s in self.log.segments)
+            history.add(self.log.archived_rows(history.rows))
+            rows, history.end = rows_after(TRANSACTIONS_FILE, TRANSACTION_FIELDS, skip=max(0, history.rows - archived))
+            history.add(rows)
+            history.ino = st.st_ino if st is not None else None
+        if history.rows - history.saved >= SAVE_EVERY:
+            history.save()
+        return history
+
+    @staticmethod
+    def _row_key(line):
+        """row_key() of a raw log line, or None if it is not a row"""
+        values = line_values(line)
+        if not values or len(values) < len(TRANSACTION_FIELDS):
+            return None
+        return row_key(dict(zip(TRANSACTION_FIELDS, values)))
+
+    def _rows_at(self, positions):
+        """Log rows by position (ascending): archived ones by the manifest counts, active ones by the row index"""
+        rows = []
+        start = 0
+        for s, path in zip(self.log.segments, self.log.segment_paths()):
+            lo = bisect_left(positions, start)
+            hi = bisect_left(positions, start + s['count'])
+            rows.extend(pick_rows(path, [p - start for p in positions[lo:hi]], TRANSACTION_FIELDS))
+            start += s['count']
+        lo = bisect_left(positions, start)
+        if lo < len(positions):
+            self.log_index.refresh(TRANSACTIONS_FILE)
+            rows.extend(self.log_index.pick(TRANSACTIONS_FILE, TRANSACTION_FIELDS, [p - start for p in positions[lo:]]))
+        return rows
+
+    def transaction_page(self, offset, limit):
+        """Archived segments are sliced by their manifest counts, the active log by its index"""
+        with file_lock.shared(TRANSACTIONS_FILE):
+            self.log.open()
+            self.log_index.refresh(TRANSACTIONS_FILE)
+            total = sum(s['count'] for s in self.log.segments) + self.log_index.rows
+            if offset is None:
+                offset = max(0, total - limit)
+            end = total if limit is None else min(total, offset + limit)
+
+            rows = []
+            start = 0
+            for s, path in zip(self.log.segments, self.log.segment_paths()):
+                if start < end and offset < start + s['count']:
+                    rows.extend(read_cache.read(path, TransactionRecord)[max(0, offset - start):end - start])
+                start += s['count']
+            if end > start:
+                first = max(0, offset - start)
+                rows.extend(self.log_index.read(TRANSACTIONS_FILE, TRANSACTION_FIELDS, first, end - start - first))
+        return rows, total
+
+    def recent_transactions(self, n):
+        """Read backwards from the end of the active log, then the newest segments"""
+        with file_lock.shared(TRANSACTIONS_FILE):
+            self.log.open()
+            rows = tail_rows(TRANSACTIONS_FILE, n, TRANSACTION_FIELDS)
+            for path in reversed(list(self.log.segment_paths())):
+                if len(rows) >= n:
+                    break
+                rows = read_cache.read(path, TransactionRecord)[-(n - len(rows)):] + rows
+        return rows[::-1]
+
+    def add_book(self, book):
+        with self._writing(BOOKS_FILE):
+            self._append(BOOKS_FILE, Book.fieldnames, book)
+            self.slots[book['isbn']] = self.bitmap.append(book['isbn'], book['available'] == 'True')
+
+    def add_books(self, books):
+        with self._writing(BOOKS_FILE):
+            self._append(BOOKS_FILE, Book.fieldnames, *books)
+            slots = self.bitmap.extend((b['isbn'], b['available'] == 'True') for b in books)
+        for book, slot in zip(books, slots):
+            self.slots[book['isbn']] = slot
+
+    def update_book(self, book, books):
+        self._rewrite_books(books)
+
+    def update_availability(self, book, books):
+        slot = self.slots.get(book['isbn'])
+        if slot is None:
+            self._rewrite_books(books)
+        else:
+            with self._writing(BOOKS_FILE):
+                self.bitmap.set(slot, book['available'] == 'True')
+
+    def delete_book(self, isbn, books):
+        self._rewrite_books(books)
+
+    def _rewrite_books(self, books):
+        """
+        Full rewrite of books.csv; row slots change, so rebuild the bitmap.
+        Loans flip bits without touching books.csv, so the transactions lock
+        is taken too: a borrow or return at another desk since this store
+        loaded refuses the rewrite instead of being reverted by it.
+        """
+        books = list(books)
+        with self._writing(TRANSACTIONS_FILE), self._writing(BOOKS_FILE):
+            Library._save_books(books)
+            self.bitmap.rebuild(books)
+        self._slot_isbns = list(map(attrgetter('isbn'), books))
+
+    def add_member(self, member):
+        self._append(MEMBERS_FILE, Member.fieldnames, member)
+
+    def add_members(self, members):
+        self._append(MEMBERS_FILE, Member.fieldnames, *members)
+
+    def update_member(self, member, members):
+        with self._writing(MEMBERS_FILE):
+            Library._save_members(members)
+
+    def delete_member(self, member_id, members):
+        with self._writing(MEMBERS_FILE):
+            Library._save_members(members)
+
+    def add_user(self, user):
+        self._append(User.USERS_FILE, User.fieldnames, user)
+
+    # ---------- open loans ----------
+
+    def restore_loans(self, store):
+        """
+        Restore the open-loan table from the last checkpoint and replay only
+        the transactions appended after it. Falls back to a full replay when
+        there is no usable checkpoint.
+        """
+        with file_lock.exclusive(TRANSACTIONS_FILE):
+            self._repair_log()
+            self._restore_loans(store)
+            self.seen[TRANSACTIONS_FILE] = file_format.stamp(TRANSACTIONS_FILE)
+            # open_loans.csv now holds exactly store.loans
+            self.snapshot.store(OPEN_LOANS_FILE, file_format.stamp(OPEN_LOANS_FILE), LoanRecord, list(store.loans.values()))
+        self.snapshot.save()
+
+    def _repair_log(self):
+        """Cut rows torn or corrupted by a crash off the end of the active log"""
+        if repair_tail(TRANSACTIONS_FILE, lambda line: valid_row(line, TRANSACTION_FIELDS)):
+            read_cache.invalidate(TRANSACTIONS_FILE)
+
+    def _restore_loans(self, store):
+        self.log.open()
+        self.log_offset = 0
+        self.pending = 0
+
+        checkpoint = self._read_checkpoint()
+        if checkpoint:
+            # open_loans.csv is derived from the log and checked against it by
+            # the checkpoint; it is not watched in self.seen, since this desk's
+            # own checkpoints rewrite it.
+            columns = self.snapshot.columns(OPEN_LOANS_FILE, file_format.stamp(OPEN_LOANS_FILE))
+            if columns is None:
+                loans = read_cache.read(OPEN_LOANS_FILE, LoanRecord)
+            else:
+                loans = LoanRecord.from_columns(columns)
+            for loan in loans:
+                store.open_loan(loan)
+            store.total_transactions = checkpoint['total_transactions']
+            store.total_borrows = checkpoint['total_borrows']
+            store.total_returns = checkpoint['total_returns']
+            self.log_offset = checkpoint['log_offset']
+        else:
+            for t in self.log.archived_rows():
+                store.apply_transaction(t)
+
+        if os.path.exists(TRANSACTIONS_FILE):
+            with open(TRANSACTIONS_FILE, 'r', newline='') as f:
+                start = self.log_offset
+                if self.log_offset:
+                    f.seek(self.log_offset)
+                    reader = csv.DictReader(f, fieldnames=LOG_FIELDS)
+                else:
+                    reader = csv.DictReader(f)
+                for t in reader:
+                    store.apply_transaction(t)
+                    self.pending += 1
+                self.log_offset = f.tell()
+            instrumentation.count_read(self.log_offset - start, self.pending)
+
+        if self.pending or not checkpoint:
+            self.checkpoint(store)
+
+        # Close out months that ended while the app was not running
+        this_month = date.today().strftime("%Y-%m")
+        if self.log.needs_rotation(this_month):
+            self._rotate(this_month)
+            self.checkpoint(store)
+
+    def _rotate(self, keep_from):
+        """Archive the active log's rows from before keep_from; the caller checkpoints"""
+        self.journal.close()  # syncs pending rows; Windows cannot replace an open file
+        self.log.rotate(keep_from)
+        read_cache.invalidate(TRANSACTIONS_FILE)
+        self.seen[TRANSACTIONS_FILE] = file_format.stamp(TRANSACTIONS_FILE)
+        self.log_offset = os.path.getsize(TRANSACTIONS_FILE)
+
+    def _read_checkpoint(self):
+        """Return the checkpoint if it still matches the loans table and log"""
+        if not os.path.exists(CHECKPOINT_FILE) or not os.path.exists(OPEN_LOANS_FILE):
+            return None
+        try:
+            with open(CHECKPOINT_FILE, 'r') as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # The loans table must be the one written with this checkpoint, and
+        # the log must not have been truncated, rotated or replaced since.
+        if os.path.getsize(OPEN_LOANS_FILE) != checkpoint.get('loans_size'):
+            return None
+        if not os.path.exists(TRANSACTIONS_FILE):
+            return checkpoint if not checkpoint.get('log_offset') else None
+        st = os.stat(TRANSACTIONS_FILE)
+        if st.st_size < checkpoint.get('log_offset', 0) or st.st_ino != checkpoint.get('log_ino'):
+            return None
+        return checkpoint
+
+    def checkpoint(self, store):
+        """
+        Persist the open-loan table together with the log position it reflects.
+        Callers hold the transactions lock.
+        """
+        def write_loans(f):
+            writer = csv.DictWriter(f, fieldnames=LOAN_FIELDS)
+            writer.writeheader()
+            writer.writerows(store.loans.values())
+
+        file_lock.write_atomic(OPEN_LOANS_FILE, write_loans)
+        read_cache.invalidate(OPEN_LOANS_FILE)
+
+        file_lock.write_atomic(CHECKPOINT_FILE, lambda f: json.dump({
+                'log_offset': self.log_offset,
+                'log_ino': os.stat(TRANSACTIONS_FILE).st_ino if os.path.exists(TRANSACTIONS_FILE) else None,
+                'loans_size': os.path.getsize(OPEN_LOANS_FILE),
+                'total_transactions': store.total_transactions,
+                'total_borrows': store.total_borrows,
+                'total_returns': store.total_returns
+            }, f))
+
+        self.pending = 0
+
+    def log_transaction(self, t, store):
+        self.log_transactions([t], store)
+
+    def log_transactions(self, transactions, store):
+        self.journal.wait(self._journal(transactions, store))
+
+    def _journal(self, transactions, store):
+        """
+        Append transactions to the log; returns the journal ticket to wait on.
+        Waiting happens after the locks are released, so other writers can
+        join the same fsync.
+        """
+        rows = io.StringIO()
+        writer = csv.writer(rows)
+        for t in transactions:
+            values = [t[f] for f in TRANSACTION_FIELDS]
+            writer.writerow(values + [row_checksum(values)])
+        with self._writing(TRANSACTIONS_FILE):
+            rotated = self._rotate_for(transactions[0])
+            start = self.log_offset
+            ticket, self.log_offset = self.journal.append(rows.getvalue(), header=TRANSACTION_HEADER)
+            self.history_index.appended(transactions, self.journal.ino, start, self.log_offset)
+            self.log.appended(transactions[0])
+
+            self.pending += len(transactions)
+            if rotated or self.pending >= CHECKPOINT_INTERVAL:
+                self.checkpoint(store)
+        return ticket
+
+    def _rotate_for(self, t):
+        """
+        Start a new active segment when t opens a new month. The store has
+        already applied t, so the checkpoint waits until t is in the log.
+        """
+        if not self.log.needs_rotation(month_of(t)):
+            return False
+        self._rotate(month_of(t))
+        return True
+
+    def commit_batch(self, books, transactions, all_books, store):
+        # Lock order is always transactions -> books. Both are checked for
+        # changes at other desks before anything is written.
+        with self._writing(TRANSACTIONS_FILE), self._writing(BOOKS_FILE):
+            slots = [self.slots.get(b['isbn']) for b in books]
+            if None in slots:
+                self._rewrite_books(all_books)
+                ticket = self._journal(transactions, store)
+            else:
+                previous = [(slot, self.bitmap.get(slot)) for slot in slots]
+                if len(books) == 1:
+                    self.bitmap.set(slots[0], books[0]['available'] == 'True')
+                else:
+                    self.bitmap.set_many((slot, b['available'] == 'True') for slot, b in zip(slots, books))
+                try:
+                    ticket = self._journal(transactions, store)
+                except Exception:
+                    self.bitmap.set_many(previous)  # the batch never reached the log
+                    raise
+        self.journal.wait(ticket)
+
+    def close(self):
+        self.bitmap.close()
+        self.journal.close()
+        if self.history_index.rows != self.history_index.saved:
+            self.history_index.save()
+
+
+_backend = None
+
+def get_backend():
+    """Return the configured storage backend (created on first use)"""
+    global _backend
+    if _backend is None:
+        if STORAGE_BACKEND == 'sqlite':
+            from sqlite_backend import SqliteBackend
+            _backend = SqliteBackend(SQLITE_FILE)
+        elif STORAGE_BACKEND == 'csv':
+            _backend = CsvBackend()
+        else:
+            raise Exception(f"Unknown storage backend: {STORAGE_BACKEND}")
+    return _backend
+
+# ==========================
+# 🗄️ LibraryStore (in-memory indexes)
+# ==========================
+class LibraryStore:
+    """
+    Process-resident copy of the library data.
+    The backend is read once; afterwards every Library call is served from
+    hash indexes (books by ISBN, members by ID, users by username) and
+    changes are written through to the storage backend.
+    """
+    _instance = None
+
+    def __init__(self):
+        self.books = {}      # isbn -> book row
+        self.members = {}    # member_id -> member row
+        self.users = {}      # username -> user row
+        self.loans = {}      # (member_id, isbn) -> open loan
+        self.member_loans = {}  # member_id -> ISBNs currently on loan
+        self.due = DueQueue()   # open loans ordered by due date
+        self.total_transactions = 0
+        self.total_borrows = 0
+        self.total_returns = 0
+        self.available_books = 0
+        self._search = None  # built on the first search
+        self.backend = get_backend()
+        self.load()
+
+    @classmethod
+    def get(cls):
+        """Return the shared store, loading it on first use or after another desk wrote"""
+        if cls._instance is None or cls._instance.backend.is_stale():
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def reset(cls):
+        """Forget the shared store so the next call reloads from disk"""
+        cls._instance = None
+
+    def load(self):
+        """Read everything from the backend and rebuild the indexes"""
+        # Loading allocates a record per row, which would set off many cyclic
+        # GC passes over the growing store; records hold no reference cycles.
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self._load()
+        finally:
+            if enabled:
+                gc.enable()
+
+    def _load(self):
+        books = self.backend.load_books()
+        members = self.backend.load_members()
+        self.books = dict(zip(map(attrgetter('isbn'), books), books))
+        self.members = dict(zip(map(attrgetter('member_id'), members), members))
+        self.users = {u['username']: u for u in self.backend.load_users()}
+        self.available_books = sum(map(attrgetter('is_available'), books))
+        self._search = None
+
+        self.loans = {}
+        self.member_loans = {}
+        self.due = DueQueue()
+        self.total_transactions = 0
+        self.total_borrows = 0
+        self.total_returns = 0
+        self.backend.restore_loans(self)
+
+    # ---------- dashboard counters ----------
+
+    def stats(self):
+        total_books = len(self.books)
+        return {
+            'total_books': total_books,
+            'available_books': self.available_books,
+            'borrowed_books': total_books - self.available_books,
+            'total_members': len(self.members),
+            'total_transactions': self.total_transactions,
+            'total_borrows': self.total_borrows,
+            'total_returns': self.total_returns,
+            # Calculate currently borrowed (borrows - returns)
+            'currently_borrowed': self.total_borrows - self.total_returns
+        }
+
+    @property
+    def search(self):
+        """Inverted index over the catalog, kept in step by the mutations below"""
+        if self._search is None:
+            self._search = SearchIndex(self.books.values())
+        return self._search
+
+    # ---------- write-through mutations ----------
+
+    def add_book(self, book):
+        self.backend.add_book(book)
+        self._index_book(BookRecord.of(book))
+
+    def add_books(self, books):
+        self.backend.add_books(books)
+        for book in books:
+            self._index_book(BookRecord.of(book))
+
+    def _index_book(self, book):
+        self.books[book.isbn] = book
+        if book.is_available:
+            self.available_books += 1
+        if self._search is not None:
+            self._search.add(book)
+
+    def save_book(self, book):
+        with self._writing_through():
+            self.backend.update_book(book, self.books.values())
+        if self._search is not None:
+            self._search.update(book)
+
+    def _set_available(self, book, available):
+        if book.is_available != available:
+            self.available_books += 1 if available else -1
+        book.is_available = available
+        if self._search is not None:
+            self._search.set_available(book['isbn'], available)
+
+    def remove_book(self, isbn):
+        with self._writing_through():
+            book = self.books.pop(isbn)
+            if book.is_available:
+                self.available_books -= 1
+            self.backend.delete_book(isbn, self.books.values())
+        if self._search is not None:
+            self._search.remove(isbn)
+
+    def add_member(self, member):
+        self.backend.add_member(member)
+        member = MemberRecord.of(member)
+        self.members[member.member_id] = member
+
+    def add_members(self, members):
+        self.backend.add_members(members)
+        for member in map(MemberRecord.of, members):
+            self.members[member.member_id] = member
+
+    def save_member(self, member):
+        with self._writing_through():
+            self.backend.update_member(member, self.members.values())
+
+    def remove_member(self, member_id):
+        with self._writing_through():
+            del self.members[member_id]
+            self.backend.delete_member(member_id, self.members.values())
+
+    def add_user(self, user):
+        self.backend.add_user(user)
+        self.users[user['username']] = user
+
+    def record_transaction(self, t):
+        """Apply a new transaction and persist it through the backend"""
+        with self._writing_through():
+            self.apply_transaction(t)
+            self.backend.log_transaction(t, self)
+
+    def commit_batch(self, books, available, transactions):
+        """Set availability on several books and log their transactions in one pass"""
+        with self._writing_through():
+            for book in books:
+                self._set_available(book, available)
+            for t in transactions:
+                self.apply_transaction(t)
+            self.backend.commit_batch(books, transactions, self.books.values(), self)
+
+    @contextmanager
+    def _writing_through(self):
+        """
+        Around a change made in memory first and then written to the
+        backend (which is handed the changed rows). If the write fails,
+        memory no longer matches what is stored, so this store is dropped
+        and the next call reloads it from the backend.
+        """
+        try:
+            yield
+        except Exception:
+            if LibraryStore._instance is self:
+                LibraryStore.reset()
+            raise
+
+    # ---------- open loans ----------
+
+    def apply_transaction(self, t):
+        """Fold one transaction row into the open-loan index and counters"""
+        self.total_transactions += 1
+        key = (t['member_id'], t['isbn'])
+
+        if t['action'] == 'BORROW':
+            self.total_borrows += 1
+            if t.get('due_date'):
+                self.open_loan(LoanRecord(intern(t['member_id']), t['isbn'], t['date'], day_ordinal(t['due_date'])))
+        elif t['action'] == 'RETURN':
+            self.total_returns += 1
+            if self.loans.pop(key, None) is not None:
+                self.due.discard(key)
+                isbns = self.member_loans[t['member_id']]
+                isbns.discard(t['isbn'])
+                if not isbns:
+                    del self.member_loans[t['member_id']]
+
+    def open_loan(self, loan):
+        loan = LoanRecord.of(loan)
+        key = (loan.member_id, loan.isbn)
+        self.loans[key] = loan
+        self.due.push(key, loan.due)
+        self.member_loans.setdefault(loan.member_id, set()).add(loan.isbn)
+
+    def loans_for_member(self, member_id):
+        """Open loans of one member, without scanning everyone else's"""
+        return [self.loans[(member_id, isbn)] for isbn in self.member_loans.get(member_id, ())]
+
+    def outstanding_count(self, member_id):
+        return len(self.member_loans.get(member_id, ()))
+
+    def book_title(self, isbn):
+        book = self.books.get(isbn)
+        return book['title'] if book else "Unknown"
+
+
 # ==========================
 # 🏛️ Library Class
 # ==========================
@@ -164,347 +1043,384 @@ class Library:
         if overdue:
             raise Exception(f"Member has {len(overdue)} overdue book(s). Please return them first.")
         
-        books = Book.load_books()
-        found = False
+        store = LibraryStore.get()
+        book = store.books.get(isbn)
 
-        for book in books:
-            if book['isbn'] == isbn:
-                found = True
-                if book['available'] == 'False':
-                    raise Exception("Book already issued")
-                book['available'] = 'False'
-
-        if not found:
+        if book is None:
             raise Exception("Book not found")
+        if book['available'] == 'False':
+            raise Exception("Book already issued")
 
-        Library._save_books(books)
-        
         # Calculate due date
         from datetime import timedelta
         due_date = (datetime.now() + timedelta(days=days)).strftime("%Y-%m-%d")
         
-        Library._log(member_id, isbn, "BORROW", due_date)
+        # Availability and the log row are written under the same locks
+        store.commit_batch([book], False, [Library._transaction(member_id, isbn, "BORROW", due_date)])
 
     @staticmethod
     def return_book(member_id, isbn):
-        books = Book.load_books()
-        found = False
+        store = LibraryStore.get()
+        book = store.books.get(isbn)
 
-        for book in books:
-            if book['isbn'] == isbn:
-                found = True
-                book['available'] = 'True'
-
-        if not found:
+        if book is None:
             raise Exception("Book not found")
 
-        Library._save_books(books)
-        Library._log(member_id, isbn, "RETURN")
+        store.commit_batch([book], True, [Library._transaction(member_id, isbn, "RETURN")])
 
     @staticmethod
-    def view_transactions():
-        if not os.path.exists(TRANSACTIONS_FILE):
-            return []
-        with open(TRANSACTIONS_FILE, 'r', newline='') as f:
-            return list(csv.DictReader(f))
+    def borrow_many(member_id, isbns, days=14):
+        """
+        Borrow several books in one checkout. Every item is validated first;
+        if any fails nothing is borrowed.
+        """
+        overdue = Library.get_overdue_books(member_id)
+        if overdue:
+            raise Exception(f"Member has {len(overdue)} overdue book(s). Please return them first.")
+
+        store = LibraryStore.get()
+        isbns = list(dict.fromkeys(isbns))  # drop repeated scans, keep order
+        books = []
+        problems = []
+
+        for isbn in isbns:
+            book = store.books.get(isbn)
+            if book is None:
+                problems.append(f"{isbn}: Book not found")
+            elif book['available'] == 'False':
+                problems.append(f"{isbn}: Book already issued")
+            else:
+                books.append(book)
+
+        if problems:
+            raise Exception("\n".join(problems))
+        if not books:
+            raise Exception("No ISBNs given")
+
+        from datetime import timedelta
+        now = datetime.now()
+        stamp = now.strftime("%Y-%m-%d %H:%M:%S")
+        due_date = (now + timedelta(days=days)).strftime("%Y-%m-%d")
+
+        store.commit_batch(books, False, [Library._transaction(member_id, b['isbn'], "BORROW", due_date, stamp)
+                                          for b in books])
+
+    @staticmethod
+    def return_many(member_id, isbns):
+        """Return several books at once; nothing is returned if any ISBN is unknown"""
+        store = LibraryStore.get()
+        isbns = list(dict.fromkeys(isbns))
+        books = []
+        problems = []
+
+        for isbn in isbns:
+            book = store.books.get(isbn)
+            if book is None:
+                problems.append(f"{isbn}: Book not found")
+            else:
+                books.append(book)
+
+        if problems:
+            raise Exception("\n".join(problems))
+        if not books:
+            raise Exception("No ISBNs given")
+
+        stamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        store.commit_batch(books, True, [Library._transaction(member_id, b['isbn'], "RETURN", stamp=stamp)
+                                         for b in books])
+
+    @staticmethod
+    def view_transactions(offset=0, limit=None, since=None, until=None):
+        """
+        Transaction history, oldest first
+        offset/limit: one page of the log
+        since/until: only dates 'YYYY-MM-DD' in [since, until]
+        """
+        backend = get_backend()
+        if since or until:
+            rows = backend.load_transactions(since, until)
+            return rows[offset:offset + limit if limit is not None else None]
+        if offset == 0 and limit is None:
+            return backend.load_transactions()
+        rows, total = backend.transaction_page(offset, limit)
+        return rows
+
+    @staticmethod
+    def transactions_between(start=None, end=None):
+        """
+        Transactions dated from start to end, oldest first. Both bounds are
+        inclusive prefixes of 'YYYY-MM-DD HH:MM:SS': ('2024-05-01', '2024-05-07')
+        is a week, ('2024-05-03 09', '2024-05-03 12') a morning.
+        """
+        return get_backend().transactions_between(start, end)
+
+    @staticmethod
+    def history_for_book(isbn):
+        """Every borrow and return of one book, oldest first (also after it was deleted)"""
+        return get_backend().history('isbn', isbn.strip())
+
+    @staticmethod
+    def history_for_member(member_id):
+        """Every borrow and return by one member, oldest first"""
+        return get_backend().history('member_id', member_id.strip())
+
+    @staticmethod
+    def rebuild_history_index():
+        """Index the whole transaction log again for the history lookups"""
+        get_backend().rebuild_history()
+
+    @staticmethod
+    def view_transactions_page(offset=None, limit=200):
+        """(rows, total) for one page of the log; offset None gives the newest page"""
+        return get_backend().transaction_page(offset, limit)
+
+    @staticmethod
+    def recent_transactions(n=100):
+        """The newest n transactions, newest first, read from the tail of the log"""
+        return get_backend().recent_transactions(n)
 
     @staticmethod
     def _save_books(books):
-        with open(BOOKS_FILE, 'w', newline='') as f:
+        def write(f):
             writer = csv.DictWriter(f, fieldnames=Book.fieldnames)
             writer.writeheader()
             writer.writerows(books)
 
+        read_cache.invalidate(BOOKS_FILE)
+        with file_lock.exclusive(BOOKS_FILE):
+            file_lock.write_atomic(BOOKS_FILE, write)
+
     @staticmethod
     def _log(member_id, isbn, action, due_date=None):
-        with open(TRANSACTIONS_FILE, 'a', newline='') as f:
-            writer = csv.DictWriter(
-                f,
-                fieldnames=['member_id', 'isbn', 'action', 'date', 'due_date']
-            )
-            if f.tell() == 0:
-                writer.writeheader()
-            writer.writerow({
-                'member_id': member_id,
-                'isbn': isbn,
-                'action': action,
-                'date': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'due_date': due_date if due_date else ''
-            })
+        LibraryStore.get().record_transaction(Library._transaction(member_id, isbn, action, due_date))
 
     @staticmethod
-    def search_books(query, filter_by='all'):
+    def _transaction(member_id, isbn, action, due_date=None, stamp=None):
+        """A log row; stamp gives all rows of one batch the same date"""
+        return {
+            'member_id': member_id,
+            'isbn': isbn,
+            'action': action,
+            'date': stamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'due_date': due_date if due_date else ''
+        }
+
+    @staticmethod
+    def search_books(query, filter_by='all', limit=None, offset=0):
         """
-        Search books by query string
+        Search books by query string, best matches first
         filter_by: 'all', 'available', 'borrowed'
+        limit/offset: return one page of the ranked results
         """
-        books = Book.load_books()
-        results = []
-        
-        query = query.lower()
-        
-        for book in books:
-            # Check if query matches title, author, or isbn
-            if (query in book['title'].lower() or 
-                query in book['author'].lower() or 
-                query in book['isbn']):
-                
-                # Apply availability filter
-                if filter_by == 'all':
-                    results.append(book)
-                elif filter_by == 'available' and book['available'] == 'True':
-                    results.append(book)
-                elif filter_by == 'borrowed' and book['available'] == 'False':
-                    results.append(book)
-        
+        results, total = Library.search_books_page(query, filter_by, limit, offset)
         return results
+
+    @staticmethod
+    def search_books_page(query, filter_by='all', limit=50, offset=0):
+        """Like search_books, but also returns the total number of matches"""
+        results, total = LibraryStore.get().search.search(query, filter_by, limit, offset)
+        return [book.copy() for book in results], total
     
     @staticmethod
     def view_all_books():
-        """Return all books with formatted info"""
-        return Book.load_books()
+        """Return all books with formatted info (copies: editing them changes nothing)"""
+        return [book.copy() for book in LibraryStore.get().books.values()]
 
     @staticmethod
     def view_all_members():
-        """Return all members"""
-        return Member.load_members()
+        """Return all members (copies)"""
+        return [member.copy() for member in LibraryStore.get().members.values()]
     
     @staticmethod
     def delete_book(isbn):
         """Delete a book by ISBN"""
-        books = Book.load_books()
-        found = False
+        store = LibraryStore.get()
+        book = store.books.get(isbn)
         
-        for book in books:
-            if book['isbn'] == isbn:
-                found = True
-                if book['available'] == 'False':
-                    raise Exception("Cannot delete: Book is currently borrowed")
-                break
-        
-        if not found:
+        if book is None:
             raise Exception("Book not found")
+        if book['available'] == 'False':
+            raise Exception("Cannot delete: Book is currently borrowed")
         
-        # Filter out the book to delete
-        books = [b for b in books if b['isbn'] != isbn]
-        Library._save_books(books)
+        store.remove_book(isbn)
 
     @staticmethod
     def edit_book(isbn, new_title=None, new_author=None):
         """Edit book details"""
-        books = Book.load_books()
-        found = False
+        store = LibraryStore.get()
+        book = store.books.get(isbn)
         
-        for book in books:
-            if book['isbn'] == isbn:
-                found = True
-                if new_title:
-                    book['title'] = new_title
-                if new_author:
-                    book['author'] = new_author
-                break
-        
-        if not found:
+        if book is None:
             raise Exception("Book not found")
         
-        Library._save_books(books)
+        if new_title:
+            book['title'] = new_title
+        if new_author:
+            book['author'] = new_author
+        
+        store.save_book(book)
 
     @staticmethod
     def delete_member(member_id):
         """Delete a member by ID"""
-        members = Member.load_members()
-        found = False
+        store = LibraryStore.get()
         
-        for member in members:
-            if member['member_id'] == member_id:
-                found = True
-                break
-        
-        if not found:
+        if member_id not in store.members:
             raise Exception("Member not found")
         
         # Check if member has borrowed books
-        transactions = Library.view_transactions()
-        borrowed_books = []
-        
-        for t in transactions:
-            if t['member_id'] == member_id and t['action'] == 'BORROW':
-                # Check if book was returned
-                returned = False
-                for t2 in transactions:
-                    if t2['member_id'] == member_id and t2['isbn'] == t['isbn'] and t2['action'] == 'RETURN':
-                        returned = True
-                        break
-                if not returned:
-                    borrowed_books.append(t['isbn'])
+        borrowed_count = store.outstanding_count(member_id)
         
-        if borrowed_books:
-            raise Exception(f"Cannot delete: Member has {len(borrowed_books)} book(s) borrowed")
+        if borrowed_count:
+            raise Exception(f"Cannot delete: Member has {borrowed_count} book(s) borrowed")
         
-        # Filter out the member to delete
-        members = [m for m in members if m['member_id'] != member_id]
-        Library._save_members(members)
+        store.remove_member(member_id)
 
     @staticmethod
     def edit_member(member_id, new_name=None, new_email=None):
         """Edit member details"""
-        members = Member.load_members()
-        found = False
+        store = LibraryStore.get()
+        member = store.members.get(member_id)
         
-        for member in members:
-            if member['member_id'] == member_id:
-                found = True
-                if new_name:
-                    member['name'] = new_name
-                if new_email:
-                    member['email'] = new_email
-                break
-        
-        if not found:
+        if member is None:
             raise Exception("Member not found")
         
-        Library._save_members(members)
+        if new_name:
+            member['name'] = new_name
+        if new_email:
+            member['email'] = new_email
+        
+        store.save_member(member)
 
     @staticmethod
     def _save_members(members):
         """Helper method to save members to CSV"""
-        with open(MEMBERS_FILE, 'w', newline='') as f:
+        def write(f):
             writer = csv.DictWriter(f, fieldnames=Member.fieldnames)
             writer.writeheader()
             writer.writerows(members)
+
+        read_cache.invalidate(MEMBERS_FILE)
+        with file_lock.exclusive(MEMBERS_FILE):
+            file_lock.write_atomic(MEMBERS_FILE, write)
     
     @staticmethod
     def get_dashboard_stats():
         """Get statistics for dashboard"""
-        books = Book.load_books()
-        members = Member.load_members()
-        transactions = Library.view_transactions()
-        
-        total_books = len(books)
-        available_books = sum(1 for b in books if b['available'] == 'True')
-        borrowed_books = total_books - available_books
-        total_members = len(members)
-        
-        # Count total borrows and returns
-        total_borrows = sum(1 for t in transactions if t['action'] == 'BORROW')
-        total_returns = sum(1 for t in transactions if t['action'] == 'RETURN')
-        
-        # Calculate currently borrowed (borrows - returns)
-        currently_borrowed = total_borrows - total_returns
-        
-        return {
-            'total_books': total_books,
-            'available_books': available_books,
-            'borrowed_books': borrowed_books,
-            'total_members': total_members,
-            'total_transactions': len(transactions),
-            'total_borrows': total_borrows,
-            'total_returns': total_returns,
-            'currently_borrowed': currently_borrowed
-        }
+        # Before anything else has loaded the store, a backend that can count
+        # without loading (SQLite) saves a full read
+        if LibraryStore._instance is None:
+            stats = get_backend().load_stats()
+            if stats is not None:
+                return stats
+        return LibraryStore.get().stats()
     
     @staticmethod
     def get_overdue_books(member_id=None):
         """Get overdue books for a specific member or all members"""
-        transactions = Library.view_transactions()
-        books = Book.load_books()
-        overdue_list = []
-        
-        # Track borrowed books with due dates
-        borrowed_books = {}
-        
-        for t in transactions:
-            if t['action'] == 'BORROW' and t.get('due_date'):
-                key = f"{t['member_id']}_{t['isbn']}"
-                borrowed_books[key] = {
-                    'member_id': t['member_id'],
-                    'isbn': t['isbn'],
-                    'due_date': t['due_date'],
-                    'borrow_date': t['date']
-                }
-            elif t['action'] == 'RETURN':
-                key = f"{t['member_id']}_{t['isbn']}"
-                if key in borrowed_books:
-                    del borrowed_books[key]  # Book returned, remove from borrowed
+        store = LibraryStore.get()
+        today = date.today().toordinal()
         
-        # Check which borrowed books are overdue
-        today = datetime.now()
+        if member_id:
+            keys = [(member_id, isbn) for isbn in store.member_loans.get(member_id, ())]
+            overdue = sorted((store.due.due(key), key) for key in keys)
+            overdue = [(due, key) for due, key in overdue if due <= today]
+        else:
+            overdue = store.due.due_on_or_before(today)
         
-        for key, info in borrowed_books.items():
-            if member_id and info['member_id'] != member_id:
-                continue
-            
-            due_date = datetime.strptime(info['due_date'], "%Y-%m-%d")
-            
-            if today > due_date:
-                # Find book title
-                book_title = "Unknown"
-                for book in books:
-                    if book['isbn'] == info['isbn']:
-                        book_title = book['title']
-                        break
-                
-                days_overdue = (today - due_date).days
-                
-                overdue_list.append({
-                    'member_id': info['member_id'],
-                    'isbn': info['isbn'],
-                    'book_title': book_title,
-                    'due_date': info['due_date'],
-                    'days_overdue': days_overdue
-                })
-        
-        return overdue_list
+        # A loan is overdue from the start of its due date
+        return [{
+            'member_id': key[0],
+            'isbn': key[1],
+            'book_title': store.book_title(key[1]),
+            'due_date': store.loans[key]['due_date'],
+            'days_overdue': today - due
+        } for due, key in overdue]
 
     @staticmethod
     def get_all_borrowed_with_due():
-        """Get all currently borrowed books with due dates"""
-        transactions = Library.view_transactions()
-        books = Book.load_books()
+        """Get all currently borrowed books with due dates, earliest due first"""
+        store = LibraryStore.get()
+        return Library._loan_rows(store, store.due.ordered())
+
+    @staticmethod
+    def get_borrowed_by_member(member_id):
+        """Currently borrowed books of one member, earliest due first"""
+        store = LibraryStore.get()
+        keys = [(member_id, isbn) for isbn in store.member_loans.get(member_id, ())]
+        return Library._loan_rows(store, sorted((store.due.due(key), key) for key in keys))
+
+    @staticmethod
+    def get_loans_coming_due(n=20):
+        """The next n loans that are not yet overdue, earliest due first"""
+        store = LibraryStore.get()
+        return Library._loan_rows(store, store.due.next_due(n, after=date.today().toordinal()))
+
+    @staticmethod
+    def _loan_rows(store, loans):
+        today = date.today().toordinal()
         borrowed_list = []
         
-        # Track borrowed books with due dates
-        borrowed_books = {}
-        
-        for t in transactions:
-            if t['action'] == 'BORROW' and t.get('due_date'):
-                key = f"{t['member_id']}_{t['isbn']}"
-                borrowed_books[key] = {
-                    'member_id': t['member_id'],
-                    'isbn': t['isbn'],
-                    'due_date': t['due_date'],
-                    'borrow_date': t['date']
-                }
-            elif t['action'] == 'RETURN':
-                key = f"{t['member_id']}_{t['isbn']}"
-                if key in borrowed_books:
-                    del borrowed_books[key]
-        
-        # Add book details
-        today = datetime.now()
-        
-        for key, info in borrowed_books.items():
-            book_title = "Unknown"
-            for book in books:
-                if book['isbn'] == info['isbn']:
-                    book_title = book['title']
-                    break
-            
-            due_date = datetime.strptime(info['due_date'], "%Y-%m-%d")
-            days_until_due = (due_date - today).days
-            is_overdue = days_until_due < 0
+        for due, key in loans:
+            # Whole days left before the due date starts; -1 once it is due
+            days_until_due = due - today - 1
             
             borrowed_list.append({
-                'member_id': info['member_id'],
-                'isbn': info['isbn'],
-                'book_title': book_title,
-                'due_date': info['due_date'],
+                'member_id': key[0],
+                'isbn': key[1],
+                'book_title': store.book_title(key[1]),
+                'due_date': store.loans[key]['due_date'],
                 'days_until_due': days_until_due,
-                'is_overdue': is_overdue
+                'is_overdue': days_until_due < 0
             })
         
         return borrowed_list
     
+    @staticmethod
+    def import_books(source, batch_size=1000):
+        """
+        Bulk-add books from a CSV file with title, author, isbn (and optional
+        available) columns. Returns an import report.
+        """
+        store = LibraryStore.get()
+
+        def validate(batch):
+            for line, row in batch:
+                if not row.get('title') or not row.get('author') or not row.get('isbn'):
+                    yield line, row, "Missing title, author or ISBN"
+                elif not Book.is_valid_isbn(row['isbn']):
+                    yield line, row, "ISBN must be 13 digits"
+                else:
+                    yield line, row, None
+
+        def to_row(row):
+            available = row.get('available') or 'True'
+            return {
+                'title': row['title'],
+                'author': row['author'],
+                'isbn': row['isbn'],
+                'available': 'False' if available == 'False' else 'True'
+            }
+
+        return _bulk_import(source, 'isbn', store.books, validate, to_row, store.add_books, batch_size)
+
+    @staticmethod
+    def import_members(source, batch_size=1000):
+        """Bulk-add members from a CSV file with name, member_id, email columns"""
+        store = LibraryStore.get()
+
+        def validate(batch):
+            for line, row in batch:
+                if not row.get('name') or not row.get('member_id') or not row.get('email'):
+                    yield line, row, "Missing name, member ID or email"
+                else:
+                    yield line, row, None
+
+        def to_row(row):
+            return {'name': row['name'], 'member_id': row['member_id'], 'email': row['email']}
+
+        return _bulk_import(source, 'member_id', store.members, validate, to_row, store.add_members, batch_size)
+
     @staticmethod
     def add_user(username, password, role, name):
         """Add a new user (admin only)"""
@@ -513,6 +1429,66 @@ class Library:
 
     @staticmethod
     def get_all_users():
-        """Get all users"""
-        return User.load_users()
+        """Get all users (copies)"""
+        return [user.copy() for user in LibraryStore.get().users.values()]
+
 
+# ==========================
+# 📥 Bulk import
+# ==========================
+def _bulk_import(source, key, existing, validate, to_row, add_many, batch_size):
+    """
+    Stream a source CSV in batches, reject invalid rows and duplicates (against
+    the existing key index and earlier rows of the same file) and write every
+    accepted row with one buffered append.
+    """
+    started = time.perf_counter()
+    accepted = []
+    rejects = []
+    seen = set()
+    total = 0
+
+    def check(batch):
+        for line, row, reason in validate(batch):
+            if reason is None:
+                value = row[key]
+                if value in existing:
+                    reason = f"Duplicate {key} already in library"
+                elif value in seen:
+                    reason = f"Duplicate {key} earlier in file"
+                else:
+                    seen.add(value)
+                    accepted.append(to_row(row))
+                    continue
+            rejects.append({'line': line, key: row.get(key) or '', 'reason': reason})
+
+    with open(source, 'r', newline='', encoding='utf-8-sig') as f:
+        batch = []
+        # Header is line 1, so the first data row is line 2
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            row = {k: (v or '').strip() for k, v in row.items() if k}
+            batch.append((line, row))
+            total += 1
+            if len(batch) >= batch_size:
+                check(batch)
+                batch = []
+        check(batch)
+        instrumentation.count_read(f.tell(), total)
+
+    if accepted:
+        add_many(accepted)
+
+    elapsed = time.perf_counter() - started
+    return {
+        'rows': total,
+        'accepted': len(accepted),
+        'rejected': rejects,
+        'seconds': elapsed,
+        'rows_per_sec': total / elapsed if elapsed else 0.0
+    }
+
+
+# ==========================
+# 📈 Instrumentation (opt-in: LIBRARY_INSTRUMENT=1)
+# ==========================
+instrumentation.install(Book, Member, User, Library)
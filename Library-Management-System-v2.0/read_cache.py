@@ -0,0 +1,67 @@
+"""
+read_cache.py - Parsed-CSV cache keyed by path
+Holds the rows of each CSV read through it and revalidates them with a single
+os.stat (inode, size, mtime_ns), so back-to-back loads of an unchanged file
+skip the open and parse. Writers in this process call invalidate() as well,
+which covers changes too quick for the mtime to move.
+
+Rows are dicts, or compact records (records.py) when a record type is given.
+"""
+
+import csv
+
+import file_format
+import instrumentation
+from log_segments import open_rows
+
+
+class ReadCache:
+    def __init__(self):
+        self.entries = {}  # path -> (stamp, rows, record type)
+        self.hits = 0
+        self.misses = 0
+
+    def read(self, path, record=None):
+        """
+        Rows of a CSV (or .csv.gz) file as dicts, or as instances of the
+        record type ([] if the file does not exist). Every call returns
+        fresh rows, so callers may modify them; read-only record types
+        are shared instead of copied.
+        """
+        stamp = file_format.stamp(path)
+        if stamp is None:
+            self.entries.pop(path, None)
+            return []
+
+        entry = self.entries.get(path)
+        if entry is not None and entry[0] == stamp and entry[2] is record:
+            self.hits += 1
+            return self._fresh(entry[1], record)
+
+        self.misses += 1
+        with open_rows(path) as f:
+            if record is None:
+                rows = list(csv.DictReader(f))
+            else:
+                reader = csv.reader(f)
+                parse = record.parser(next(reader, []))
+                rows = [parse(row) for row in reader if row]
+        instrumentation.count_read(stamp[1], len(rows))
+        # Re-stat after parsing: if the file changed meanwhile, do not keep it
+        if file_format.stamp(path) == stamp:
+            self.entries[path] = (stamp, rows, record)
+        return self._fresh(rows, record)
+
+    @staticmethod
+    def _fresh(rows, record):
+        if record is None:
+            return [dict(row) for row in rows]
+        if not record.mutable:
+            return list(rows)
+        return [row.copy() for row in rows]
+
+    def invalidate(self, path):
+        self.entries.pop(path, None)
+
+    def clear(self):
+        self.entries.clear()
@@ -0,0 +1,204 @@
+"""
+records.py - Compact row types for the library core
+csv.DictReader gives every row its own dict and its own copy of every
+string, which at a million log rows costs hundreds of MB. These __slots__
+records hold the same columns without a per-row dict:
+    - BookRecord keeps availability as a bool and interns author names
+    - MemberRecord holds a members.csv row
+    - LoanRecord keeps the due date as a day ordinal
+    - TransactionRecord interns member IDs, ISBNs, actions and due dates,
+      so the rows of a long log share them
+Records still answer r['title'], r.get(), keys(), items() and dict(r), so
+the GUI and the csv.DictWriter-based writers use them like the old dicts.
+
+to_columns()/from_columns() convert a list of records to one list per
+attribute and back, for the binary snapshot (snapshot.py).
+"""
+
+from datetime import date
+from operator import attrgetter, itemgetter
+from sys import intern
+
+
+class Record:
+    __slots__ = ()
+    fields = ()          # CSV columns, in file order
+    mutable = False      # read-only records can be shared instead of copied
+    columns = ()         # (attribute, snapshot column kind), in __init__ order
+    interned = ()        # attributes interned when read back from a snapshot
+    _keys = {}.keys()    # dict_keys of fields: DictWriter subtracts fieldnames from it
+    _getters = {}        # field -> attrgetter; unknown keys raise KeyError
+
+    def __init_subclass__(cls):
+        cls._keys = dict.fromkeys(cls.fields).keys()
+        cls._getters = {f: attrgetter(f) for f in cls.fields}
+
+    # ---------- dict-compatible access ----------
+
+    def __getitem__(self, key):
+        return self._getters[key](self)
+
+    def get(self, key, default=None):
+        getter = self._getters.get(key)
+        return getter(self) if getter else default
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __len__(self):
+        return len(self.fields)
+
+    def keys(self):
+        return self._keys
+
+    def values(self):
+        return [getattr(self, f) for f in self.fields]
+
+    def items(self):
+        return [(f, getattr(self, f)) for f in self.fields]
+
+    def __eq__(self, other):
+        if isinstance(other, (Record, dict)):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+    # ---------- construction ----------
+
+    @classmethod
+    def of(cls, row):
+        """A record for a dict row (a record of this type is returned as is)"""
+        if isinstance(row, cls):
+            return row
+        return cls.from_csv(*(row.get(f) or '' for f in cls.fields))
+
+    @classmethod
+    def from_csv(cls, *values):
+        """Build from the CSV column values, in fields order"""
+        return cls(*values)
+
+    @classmethod
+    def to_columns(cls, rows):
+        """{attribute: [value per row]} for every snapshot column"""
+        return {name: list(map(attrgetter(name), rows)) for name, kind in cls.columns}
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Records from to_columns() output"""
+        values = [map(intern, columns[name]) if name in cls.interned else columns[name]
+                  for name, kind in cls.columns]
+        return list(map(cls, *values))
+
+    @classmethod
+    def parser(cls, header):
+        """Function turning csv.reader rows of a file with this header into records"""
+        width = len(header)
+        picks = [header.index(f) if f in header else width for f in cls.fields]
+        pick = itemgetter(*picks)
+        pad = [''] * (width + 1)  # short rows and missing columns read as ''
+        make = cls.from_csv
+
+        def parse(row):
+            if len(row) <= width:
+                row = row + pad[len(row):]
+            return make(*pick(row))
+        return parse
+
+
+class BookRecord(Record):
+    __slots__ = ('title', 'author', 'isbn', 'is_available')
+    fields = ('title', 'author', 'isbn', 'available')
+    mutable = True
+    columns = (('title', 'str'), ('author', 'str'), ('isbn', 'str'), ('is_available', 'bits'))
+    interned = ('author',)
+
+    def __init__(self, title, author, isbn, is_available=True):
+        self.title = title
+        self.author = author
+        self.isbn = isbn
+        self.is_available = is_available
+
+    @classmethod
+    def from_csv(cls, title, author, isbn, available):
+        return cls(title, intern(author), isbn, available == 'True')
+
+    @property
+    def available(self):
+        return 'True' if self.is_available else 'False'
+
+    @available.setter
+    def available(self, value):
+        self.is_available = value is True or value == 'True'
+
+    def __setitem__(self, key, value):
+        if key == 'available':
+            self.is_available = value is True or value == 'True'
+        elif key in self._keys:
+            setattr(self, key, value)
+        else:
+            raise KeyError(key)
+
+    def copy(self):
+        return BookRecord(self.title, self.author, self.isbn, self.is_available)
+
+
+class MemberRecord(Record):
+    __slots__ = ('name', 'member_id', 'email')
+    fields = ('name', 'member_id', 'email')
+    mutable = True
+    columns = (('name', 'str'), ('member_id', 'str'), ('email', 'str'))
+
+    def __init__(self, name, member_id, email):
+        self.name = name
+        self.member_id = member_id
+        self.email = email
+
+    def __setitem__(self, key, value):
+        if key not in self._keys:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def copy(self):
+        return MemberRecord(self.name, self.member_id, self.email)
+
+
+class LoanRecord(Record):
+    __slots__ = ('member_id', 'isbn', 'borrow_date', 'due')
+    fields = ('member_id', 'isbn', 'borrow_date', 'due_date')
+    columns = (('member_id', 'str'), ('isbn', 'str'), ('borrow_date', 'str'), ('due', 'i32'))
+    interned = ('member_id',)
+
+    def __init__(self, member_id, isbn, borrow_date, due):
+        self.member_id = member_id
+        self.isbn = isbn
+        self.borrow_date = borrow_date
+        self.due = due  # date.toordinal() of the due date
+
+    @classmethod
+    def from_csv(cls, member_id, isbn, borrow_date, due_date):
+        return cls(intern(member_id), isbn, borrow_date, date.fromisoformat(due_date[:10]).toordinal())
+
+    @property
+    def due_date(self):
+        return date.fromordinal(self.due).isoformat()
+
+
+class TransactionRecord(Record):
+    __slots__ = ('member_id', 'isbn', 'action', 'date', 'due_date')
+    fields = ('member_id', 'isbn', 'action', 'date', 'due_date')
+
+    def __init__(self, member_id, isbn, action, date, due_date):
+        self.member_id = member_id
+        self.isbn = isbn
+        self.action = action
+        self.date = date
+        self.due_date = due_date
+
+    @classmethod
+    def from_csv(cls, member_id, isbn, action, date, due_date):
+        return cls(intern(member_id), intern(isbn), intern(action), date, intern(due_date))
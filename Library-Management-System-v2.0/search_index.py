@@ -0,0 +1,166 @@
+"""
+search_index.py - Trigram inverted index for book search
+Answers the same substring queries as the original linear scan (query found
+in title, author or ISBN), but only verifies books that contain every
+trigram of the query, and ranks the matches.
+"""
+
+import heapq
+
+
+def trigrams(text):
+    """Trigrams of text padded with spaces, so 1-2 character values still index"""
+    text = f" {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _rank(match):
+    score, neg_doc_id, _ = match
+    return score, neg_doc_id
+
+
+class SearchIndex:
+    def __init__(self, books=()):
+        self.postings = {}    # trigram -> set of doc ids
+        self.docs = {}        # doc id -> book row
+        self.text = {}        # doc id -> (lowered title, lowered author, isbn) as indexed
+        self.doc_ids = {}     # isbn -> doc id
+        self.available = bytearray()  # doc id -> 1 when available
+        self.next_id = 0
+        for book in books:
+            self.add(book)
+
+    # ---------- maintenance ----------
+
+    def add(self, book):
+        doc_id = self.next_id
+        self.next_id += 1
+        self.docs[doc_id] = book
+        self.doc_ids[book['isbn']] = doc_id
+        self.available.append(1 if book['available'] == 'True' else 0)
+        self.text[doc_id] = text = self._text(book)
+
+        postings = self.postings
+        for gram in self._grams(text):
+            ids = postings.get(gram)
+            if ids is None:
+                postings[gram] = {doc_id}
+            else:
+                ids.add(doc_id)
+
+    def remove(self, isbn):
+        doc_id = self.doc_ids.pop(isbn, None)
+        if doc_id is None:
+            return
+        del self.docs[doc_id]
+        self.available[doc_id] = 0
+
+        for gram in self._grams(self.text.pop(doc_id)):
+            ids = self.postings.get(gram)
+            if ids is not None:
+                ids.discard(doc_id)
+                if not ids:
+                    del self.postings[gram]
+
+    def update(self, book):
+        """Re-index a book after its title or author changed"""
+        doc_id = self.doc_ids[book['isbn']]
+        text = self._text(book)
+        old = self._grams(self.text[doc_id])
+        new = self._grams(text)
+        self.text[doc_id] = text
+
+        for gram in old - new:
+            ids = self.postings[gram]
+            ids.discard(doc_id)
+            if not ids:
+                del self.postings[gram]
+        for gram in new - old:
+            self.postings.setdefault(gram, set()).add(doc_id)
+
+    def set_available(self, isbn, available):
+        doc_id = self.doc_ids.get(isbn)
+        if doc_id is not None:
+            self.available[doc_id] = 1 if available else 0
+
+    @staticmethod
+    def _text(book):
+        return book['title'].lower(), book['author'].lower(), book['isbn']
+
+    @staticmethod
+    def _grams(text):
+        title, author, isbn = text
+        return trigrams(title) | trigrams(author) | trigrams(isbn)
+
+    # ---------- queries ----------
+
+    def search(self, query, filter_by='all', limit=None, offset=0):
+        """
+        Return (page, total): the matching books ranked by relevance, sliced
+        to [offset:offset + limit], and the total number of matches.
+        filter_by: 'all', 'available', 'borrowed'
+        """
+        query = query.lower()
+        matches = []
+
+        for doc_id in self._candidates(query):
+            if filter_by == 'available' and not self.available[doc_id]:
+                continue
+            if filter_by == 'borrowed' and self.available[doc_id]:
+                continue
+            score = self._score(query, *self.text[doc_id])
+            if score:
+                matches.append((score, -doc_id, self.docs[doc_id]))
+
+        # Best score first; ties keep catalog order
+        if limit is None:
+            ranked = sorted(matches, key=_rank, reverse=True)[offset:]
+        else:
+            ranked = heapq.nlargest(offset + limit, matches, key=_rank)[offset:]
+
+        return [m[2] for m in ranked], len(matches)
+
+    def _candidates(self, query):
+        if len(query) >= 3:
+            # Unpadded trigrams: the query may sit anywhere inside a field
+            grams = {query[i:i + 3] for i in range(len(query) - 2)}
+            postings = sorted((self.postings.get(g, set()) for g in grams), key=len)
+            result = set(postings[0])
+            for ids in postings[1:]:
+                result &= ids
+                if not result:
+                    break
+            return result
+
+        # Shorter than a trigram: union every trigram that contains it
+        result = set()
+        for gram, ids in self.postings.items():
+            if query in gram:
+                result |= ids
+        return result
+
+    @staticmethod
+    def _score(query, title, author, isbn):
+        """0 if the book does not match, otherwise higher is more relevant"""
+        score = 0
+
+        if query in title:
+            if title == query:
+                score += 100
+            elif title.startswith(query):
+                score += 60
+            elif f" {query}" in f" {title}":
+                score += 40
+            else:
+                score += 20
+        if query in author:
+            if author == query:
+                score += 50
+            elif f" {query}" in f" {author}":
+                score += 25
+            else:
+                score += 10
+        if query in isbn:
+            score += 90 if isbn == query else 15
+
+        return score
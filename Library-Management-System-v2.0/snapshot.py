@@ -0,0 +1,149 @@
+"""
+snapshot.py - Binary snapshot of the parsed CSV datasets
+Parsing books.csv, members.csv and open_loans.csv row by row dominates
+startup on a large library. The snapshot keeps the same rows column by
+column in one file, so startup reads it in a single call and turns each
+column back into Python values with a single decode/split.
+
+File layout (header as in file_format.py):
+    magic    b'LSN1'
+    version  uint32
+    crc      uint32   CRC32 of everything after the header
+    length   uint32   bytes after the header
+    index    uint32 length + JSON: for every source file its stamp
+             (inode, size, mtime_ns), row count and columns
+             (name, kind, offset, length)
+    columns  raw column data
+Column kinds:
+    str   UTF-8 values joined by NUL
+    bits  one bit per row, LSB-first (the layout of books.avail)
+    i32   little-endian int32 array
+
+A section is only used while its source file still has the recorded stamp,
+so a CSV changed by hand or at another desk is simply parsed again. A
+damaged or outdated file is ignored as a whole and rewritten.
+"""
+
+import json
+import struct
+from array import array
+
+import file_format
+import instrumentation
+from availability import pack_bits, unpack_bits
+
+MAGIC = b'LSN1'
+VERSION = 1
+INDEX_LENGTH = struct.Struct('<I')
+
+
+def _encode(kind, values):
+    if kind == 'str':
+        joined = '\x00'.join(values)
+        if joined.count('\x00') != max(0, len(values) - 1):
+            raise ValueError("NUL character in a value")
+        return joined.encode('utf-8')
+    if kind == 'bits':
+        return pack_bits(values)
+    if kind == 'i32':
+        return file_format.int_bytes(array('i', values))
+    raise ValueError(f"Unknown column kind {kind!r}")
+
+
+def _decode(kind, data, rows):
+    if kind == 'str':
+        return data.decode('utf-8').split('\x00') if rows else []
+    if kind == 'bits':
+        return unpack_bits(data, rows)
+    if kind == 'i32':
+        return file_format.ints(data).tolist()
+    raise ValueError(f"Unknown column kind {kind!r}")
+
+
+class Snapshot:
+    def __init__(self, path):
+        self.path = path
+        self.sections = {}   # source path -> (stamp, rows, [(name, kind, bytes)])
+        self.loaded = None   # stamp of the snapshot file the sections came from
+        self.dirty = False
+
+    # ---------- reading ----------
+
+    def columns(self, source, stamp):
+        """{column: values} stored for source, or None unless stamp still matches"""
+        self._refresh()
+        section = self.sections.get(source)
+        if section is None or stamp is None or section[0] != stamp:
+            return None
+        stamp, rows, columns = section
+        return {name: _decode(kind, data, rows) for name, kind, data in columns}
+
+    def _refresh(self):
+        """(Re)read the file if it changed since it was last read or written"""
+        stamp = file_format.stamp(self.path)
+        if stamp == self.loaded or self.dirty:
+            return
+        self.loaded = stamp
+        self.sections = {}
+        if stamp is None:
+            return
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        instrumentation.count_read(len(data))
+        try:
+            self.sections = self._parse(data)
+        except (ValueError, KeyError, TypeError, struct.error):
+            self.sections = {}  # damaged or from another version: rebuilt on save
+
+    @staticmethod
+    def _parse(data):
+        body = file_format.read_body(data, MAGIC, VERSION)
+        index_length, = INDEX_LENGTH.unpack_from(body, 0)
+        start = INDEX_LENGTH.size + index_length
+        index = json.loads(bytes(body[INDEX_LENGTH.size:start]))
+        sections = {}
+        for source, entry in index.items():
+            columns = [(name, kind, bytes(body[start + offset:start + offset + size]))
+                       for name, kind, offset, size in entry['columns']]
+            sections[source] = (tuple(entry['stamp']), entry['rows'], columns)
+        return sections
+
+    # ---------- writing ----------
+
+    def store(self, source, stamp, record, rows):
+        """Remember rows (records of one type) as the content of source at stamp"""
+        self._refresh()
+        section = self.sections.get(source)
+        if stamp is None or (section is not None and section[0] == stamp):
+            return
+        values = record.to_columns(rows)
+        try:
+            columns = [(name, kind, _encode(kind, values[name])) for name, kind in record.columns]
+        except ValueError:
+            self.sections.pop(source, None)  # not representable: keep parsing the CSV
+        else:
+            self.sections[source] = (stamp, len(rows), columns)
+        self.dirty = True
+
+    def save(self):
+        """Write the sections out in one atomic replace (no-op when unchanged)"""
+        if not self.dirty:
+            return
+        index = {}
+        blobs = []
+        offset = 0
+        for source, (stamp, rows, columns) in self.sections.items():
+            entry = index[source] = {'stamp': list(stamp), 'rows': rows, 'columns': []}
+            for name, kind, data in columns:
+                entry['columns'].append([name, kind, offset, len(data)])
+                blobs.append(data)
+                offset += len(data)
+        index = json.dumps(index).encode()
+        body = b''.join([INDEX_LENGTH.pack(len(index)), index] + blobs)
+
+        try:
+            file_format.write(self.path, MAGIC, VERSION, body)
+        except OSError:
+            return  # the snapshot is only a cache; try again next load
+        self.loaded = file_format.stamp(self.path)
+        self.dirty = False
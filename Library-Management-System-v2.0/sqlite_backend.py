@@ -0,0 +1,425 @@
+"""
+sqlite_backend.py - SQLite storage backend for the Library Management System
+Keeps books, members, users, transactions and the open-loan table in one
+indexed database so point lookups and updates do not scale with data size.
+
+Enable it with LIBRARY_BACKEND=sqlite. Existing CSV data can be moved over
+once with:
+
+    python sqlite_backend.py [data_dir]
+"""
+
+import csv
+import os
+import sqlite3
+import sys
+
+import instrumentation
+from availability import AvailabilityBitmap
+from log_segments import SegmentedLog
+from main import StorageBackend, Book, Member, User, TRANSACTION_FIELDS, LOAN_FIELDS
+from records import BookRecord, LoanRecord, MemberRecord
+
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS books (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        isbn TEXT UNIQUE NOT NULL,
+        title TEXT NOT NULL,
+        author TEXT NOT NULL,
+        available TEXT NOT NULL DEFAULT 'True'
+    );
+
+    CREATE TABLE IF NOT EXISTS members (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        member_id TEXT UNIQUE NOT NULL,
+        name TEXT NOT NULL,
+        email TEXT NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        role TEXT NOT NULL,
+        name TEXT NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS transactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        member_id TEXT NOT NULL,
+        isbn TEXT NOT NULL,
+        action TEXT NOT NULL,
+        date TEXT NOT NULL,
+        due_date TEXT NOT NULL DEFAULT ''
+    );
+    CREATE INDEX IF NOT EXISTS idx_transactions_member ON transactions(member_id);
+    CREATE INDEX IF NOT EXISTS idx_transactions_isbn ON transactions(isbn);
+    CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(date);
+
+    CREATE TABLE IF NOT EXISTS open_loans (
+        member_id TEXT NOT NULL,
+        isbn TEXT NOT NULL,
+        borrow_date TEXT NOT NULL,
+        due_date TEXT NOT NULL,
+        PRIMARY KEY (member_id, isbn)
+    );
+    CREATE INDEX IF NOT EXISTS idx_open_loans_due ON open_loans(due_date);
+
+    CREATE TABLE IF NOT EXISTS counters (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    );
+'''
+
+COUNTERS = ('total_transactions', 'total_borrows', 'total_returns')
+
+
+class SqliteBackend(StorageBackend):
+    def __init__(self, db_name):
+        """Open (and if needed create) the library database"""
+        self.db_name = db_name
+        self.data_version = None  # PRAGMA data_version when the store was loaded
+        try:
+            self.conn = sqlite3.connect(db_name)
+            self.conn.row_factory = sqlite3.Row
+            self.conn.execute("PRAGMA journal_mode = WAL")
+            self.conn.execute("PRAGMA synchronous = NORMAL")
+            self.conn.executescript(SCHEMA)
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO counters (name, value) VALUES (?, 0)",
+                [(name,) for name in COUNTERS]
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            raise Exception(f"Database connection error: {e}")
+
+    def _select(self, table, fieldnames, order='id', record=None):
+        cursor = self.conn.execute(f"SELECT {', '.join(fieldnames)} FROM {table} ORDER BY {order}")
+        return self._rows(cursor, record)
+
+    @staticmethod
+    def _rows(cursor, record=None):
+        """Rows as dicts, or as records when the columns are in record.fields order"""
+        # Byte counts are not visible through sqlite3, only rows
+        if record is None:
+            rows = [dict(row) for row in cursor]
+        else:
+            rows = [record.from_csv(*row) for row in cursor]
+        instrumentation.count_read(0, len(rows))
+        return rows
+
+    def _write(self, sql, params=()):
+        """Run one statement in its own transaction"""
+        try:
+            with self.conn:
+                self.conn.execute(sql, params)
+        except sqlite3.IntegrityError as e:
+            raise Exception(f"Duplicate record: {e}")
+        except sqlite3.Error as e:
+            raise Exception(f"Database error: {e}")
+
+    def _write_many(self, sql, rows):
+        """Run one statement for every row inside a single transaction"""
+        try:
+            with self.conn:
+                self.conn.executemany(sql, rows)
+        except sqlite3.IntegrityError as e:
+            raise Exception(f"Duplicate record: {e}")
+        except sqlite3.Error as e:
+            raise Exception(f"Database error: {e}")
+
+    # ---------- reads ----------
+
+    def load_books(self):
+        return self._select('books', Book.fieldnames, record=BookRecord)
+
+    def load_members(self):
+        return self._select('members', Member.fieldnames, record=MemberRecord)
+
+    def load_users(self):
+        return self._select('users', User.fieldnames)
+
+    def load_transactions(self, since=None, until=None):
+        if not since and not until:
+            return self._select('transactions', TRANSACTION_FIELDS)
+        # date is 'YYYY-MM-DD HH:MM:SS', so compare on the indexed column directly
+        cursor = self.conn.execute(
+            f"SELECT {', '.join(TRANSACTION_FIELDS)} FROM transactions "
+            "WHERE date >= ? AND date < ? ORDER BY id",
+            (since or '', (until or '9999-12-31') + '~')
+        )
+        return self._rows(cursor)
+
+    def transactions_between(self, since=None, until=None):
+        # load_transactions already compares bounds as prefixes on the date index
+        return self.load_transactions(since, until)
+
+    def history(self, field, key):
+        # field is 'isbn' or 'member_id', both indexed
+        cursor = self.conn.execute(
+            f"SELECT {', '.join(TRANSACTION_FIELDS)} FROM transactions WHERE {field} = ? ORDER BY id", (key,)
+        )
+        return self._rows(cursor)
+
+    def rebuild_history(self):
+        try:
+            with self.conn:
+                self.conn.execute("REINDEX idx_transactions_isbn")
+                self.conn.execute("REINDEX idx_transactions_member")
+        except sqlite3.Error as e:
+            raise Exception(f"Database error: {e}")
+
+    def transaction_page(self, offset, limit):
+        total = self.conn.execute("SELECT value FROM counters WHERE name = 'total_transactions'").fetchone()[0]
+        if offset is None:
+            offset = max(0, total - limit)
+        cursor = self.conn.execute(
+            f"SELECT {', '.join(TRANSACTION_FIELDS)} FROM transactions ORDER BY id LIMIT ? OFFSET ?",
+            (-1 if limit is None else limit, offset)
+        )
+        return self._rows(cursor), total
+
+    def recent_transactions(self, n):
+        cursor = self.conn.execute(
+            f"SELECT {', '.join(TRANSACTION_FIELDS)} FROM transactions ORDER BY id DESC LIMIT ?", (max(n, 0),)
+        )
+        return self._rows(cursor)
+
+    # ---------- writes ----------
+
+    def add_book(self, book):
+        self._write(
+            "INSERT INTO books (title, author, isbn, available) VALUES (?, ?, ?, ?)",
+            (book['title'], book['author'], book['isbn'], book['available'])
+        )
+
+    def add_books(self, books):
+        self._write_many(
+            "INSERT INTO books (title, author, isbn, available) VALUES (:title, :author, :isbn, :available)",
+            books
+        )
+
+    def update_book(self, book, books):
+        self._write(
+            "UPDATE books SET title = ?, author = ?, available = ? WHERE isbn = ?",
+            (book['title'], book['author'], book['available'], book['isbn'])
+        )
+
+    def delete_book(self, isbn, books):
+        self._write("DELETE FROM books WHERE isbn = ?", (isbn,))
+
+    def add_member(self, member):
+        self._write(
+            "INSERT INTO members (name, member_id, email) VALUES (?, ?, ?)",
+            (member['name'], member['member_id'], member['email'])
+        )
+
+    def add_members(self, members):
+        self._write_many(
+            "INSERT INTO members (name, member_id, email) VALUES (:name, :member_id, :email)",
+            members
+        )
+
+    def update_member(self, member, members):
+        self._write(
+            "UPDATE members SET name = ?, email = ? WHERE member_id = ?",
+            (member['name'], member['email'], member['member_id'])
+        )
+
+    def delete_member(self, member_id, members):
+        self._write("DELETE FROM members WHERE member_id = ?", (member_id,))
+
+    def add_user(self, user):
+        self._write(
+            "INSERT INTO users (username, password, role, name) VALUES (?, ?, ?, ?)",
+            (user['username'], user['password'], user['role'], user['name'])
+        )
+
+    # ---------- transactions & open loans ----------
+
+    def restore_loans(self, store):
+        self.data_version = self._data_version()
+        for loan in self._select('open_loans', LOAN_FIELDS, order='rowid', record=LoanRecord):
+            store.open_loan(loan)
+        for row in self.conn.execute("SELECT name, value FROM counters"):
+            setattr(store, row['name'], row['value'])
+
+    def log_transaction(self, t, store):
+        """Append the transaction and update open loans and counters atomically"""
+        try:
+            with self.conn:
+                self._insert_transaction(t)
+        except sqlite3.Error as e:
+            raise Exception(f"Database error: {e}")
+
+    def log_transactions(self, transactions, store):
+        try:
+            with self.conn:
+                for t in transactions:
+                    self._insert_transaction(t)
+        except sqlite3.Error as e:
+            raise Exception(f"Database error: {e}")
+
+    def commit_batch(self, books, transactions, all_books, store):
+        """Availability updates and their log rows commit as one transaction"""
+        try:
+            with self.conn:
+                self.conn.executemany(
+                    "UPDATE books SET available = ? WHERE isbn = ?",
+                    [(b['available'], b['isbn']) for b in books]
+                )
+                for t in transactions:
+                    self._insert_transaction(t)
+        except sqlite3.Error as e:
+            raise Exception(f"Database error: {e}")
+
+    def _insert_transaction(self, t):
+        self.conn.execute(
+            "INSERT INTO transactions (member_id, isbn, action, date, due_date) VALUES (?, ?, ?, ?, ?)",
+            (t['member_id'], t['isbn'], t['action'], t['date'], t.get('due_date') or '')
+        )
+        bump = ['total_transactions']
+
+        if t['action'] == 'BORROW':
+            bump.append('total_borrows')
+            if t.get('due_date'):
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO open_loans (member_id, isbn, borrow_date, due_date) VALUES (?, ?, ?, ?)",
+                    (t['member_id'], t['isbn'], t['date'], t['due_date'])
+                )
+        elif t['action'] == 'RETURN':
+            bump.append('total_returns')
+            self.conn.execute(
+                "DELETE FROM open_loans WHERE member_id = ? AND isbn = ?",
+                (t['member_id'], t['isbn'])
+            )
+
+        self.conn.executemany(
+            "UPDATE counters SET value = value + 1 WHERE name = ?",
+            [(name,) for name in bump]
+        )
+
+    def load_stats(self):
+        """Counts straight from the indexed tables and the counters row"""
+        books = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(available = 'True'), 0) FROM books"
+        ).fetchone()
+        members = self.conn.execute("SELECT COUNT(*) FROM members").fetchone()[0]
+        counters = {row['name']: row['value'] for row in self.conn.execute("SELECT name, value FROM counters")}
+        return {
+            'total_books': books[0],
+            'available_books': books[1],
+            'borrowed_books': books[0] - books[1],
+            'total_members': members,
+            'total_transactions': counters['total_transactions'],
+            'total_borrows': counters['total_borrows'],
+            'total_returns': counters['total_returns'],
+            'currently_borrowed': counters['total_borrows'] - counters['total_returns']
+        }
+
+    def _data_version(self):
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def is_stale(self):
+        """data_version moves when another connection commits"""
+        return self._data_version() != self.data_version
+
+    def close(self):
+        self.conn.close()
+
+
+# ==========================
+# CSV -> SQLite migration
+# ==========================
+def migrate_csv_to_sqlite(data_dir, db_name):
+    """
+    One-shot copy of books.csv, members.csv, users.csv and the transaction
+    log (archived segments, then transactions.csv) into a fresh database.
+    Returns the number of rows copied per table.
+    """
+    if os.path.exists(db_name):
+        raise Exception(f"{db_name} already exists; remove it to migrate again")
+
+    def read(name):
+        path = os.path.join(data_dir, name)
+        if not os.path.exists(path):
+            return []
+        with open(path, 'r', newline='') as f:
+            return list(csv.DictReader(f))
+
+    backend = SqliteBackend(db_name)
+    conn = backend.conn
+    counts = {}
+
+    try:
+        with conn:
+            books = read('books.csv')
+            # books.csv keeps the availability a book was written with; the
+            # current one is in books.avail (see availability.py)
+            if os.path.exists(os.path.join(data_dir, 'books.avail')):
+                bitmap = AvailabilityBitmap(os.path.join(data_dir, 'books.avail'))
+                try:
+                    bitmap.attach(books)
+                finally:
+                    bitmap.close()
+            conn.executemany(
+                "INSERT OR REPLACE INTO books (title, author, isbn, available) VALUES (:title, :author, :isbn, :available)",
+                books
+            )
+            members = read('members.csv')
+            conn.executemany(
+                "INSERT OR REPLACE INTO members (name, member_id, email) VALUES (:name, :member_id, :email)",
+                members
+            )
+            users = read('users.csv')
+            conn.executemany(
+                "INSERT OR REPLACE INTO users (username, password, role, name) VALUES (:username, :password, :role, :name)",
+                users
+            )
+            log = SegmentedLog(os.path.join(data_dir, 'transactions.csv'),
+                               os.path.join(data_dir, 'log'), TRANSACTION_FIELDS)
+            log.open()
+            transactions = list(log.archived_rows()) + read('transactions.csv')
+            conn.executemany(
+                "INSERT INTO transactions (member_id, isbn, action, date, due_date) VALUES (:member_id, :isbn, :action, :date, :due_date)",
+                ({**t, 'due_date': t.get('due_date') or ''} for t in transactions)
+            )
+
+            # A (member, ISBN) pair is on loan when its latest BORROW/RETURN
+            # event is a BORROW with a due date - the same rule the CSV replay uses.
+            conn.execute('''
+                INSERT INTO open_loans (member_id, isbn, borrow_date, due_date)
+                SELECT member_id, isbn, date, due_date FROM transactions
+                WHERE action = 'BORROW' AND id IN (
+                    SELECT MAX(id) FROM transactions
+                    WHERE action = 'RETURN' OR (action = 'BORROW' AND due_date != '')
+                    GROUP BY member_id, isbn
+                )
+            ''')
+            conn.execute('''
+                UPDATE counters SET value = CASE name
+                    WHEN 'total_transactions' THEN (SELECT COUNT(*) FROM transactions)
+                    WHEN 'total_borrows' THEN (SELECT COUNT(*) FROM transactions WHERE action = 'BORROW')
+                    WHEN 'total_returns' THEN (SELECT COUNT(*) FROM transactions WHERE action = 'RETURN')
+                END
+            ''')
+
+        counts = {'books': len(books), 'members': len(members),
+                  'users': len(users), 'transactions': len(transactions)}
+    except sqlite3.Error as e:
+        backend.close()
+        os.remove(db_name)
+        raise Exception(f"Migration failed: {e}")
+
+    backend.close()
+    return counts
+
+
+if __name__ == "__main__":
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else "data"
+    db_name = os.path.join(data_dir, "library.db")
+    counts = migrate_csv_to_sqlite(data_dir, db_name)
+    print(f"Migrated into {db_name}:")
+    for table, n in counts.items():
+        print(f"  {table}: {n}")
@@ -0,0 +1,42 @@
+"""Binary cache files: header checks and round trips"""
+
+import pytest
+
+import file_format
+from history_index import HistoryIndex
+from records import LoanRecord
+from snapshot import Snapshot
+
+
+def test_damaged_body_is_refused(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    file_format.write(path, b'TEST', 1, b'payload')
+    with open(path, 'rb') as f:
+        data = f.read()
+    assert file_format.read_body(data, b'TEST', 1) == b'payload'
+
+    with pytest.raises(ValueError):
+        file_format.read_body(data[:-1] + b'X', b'TEST', 1)
+    with pytest.raises(ValueError):
+        file_format.read_body(data, b'TEST', 2)
+
+
+def test_snapshot_and_history_index_round_trip(tmp_path):
+    source = tmp_path / "open_loans.csv"
+    source.write_text("member_id,isbn,borrow_date,due_date\n")
+    stamp = file_format.stamp(str(source))
+    loans = [LoanRecord.from_csv("M1", "9780000000001", "2024-01-01 10:00:00", "2024-01-15")]
+    snapshot = Snapshot(str(tmp_path / "library.snap"))
+    snapshot.store(str(source), stamp, LoanRecord, loans)
+    snapshot.save()
+    columns = Snapshot(snapshot.path).columns(str(source), stamp)
+    assert LoanRecord.from_columns(columns) == loans
+
+    index = HistoryIndex(str(tmp_path / "history.idx"))
+    index.add([{'member_id': "M1", 'isbn': "9780000000001", 'date': "2024-01-01 10:00:00"},
+               {'member_id': "M2", 'isbn': "9780000000001", 'date': "2024-01-02 10:00:00"}])
+    index.save()
+    loaded = HistoryIndex(index.path)
+    loaded.load()
+    assert loaded.lookup('isbn', "9780000000001") == [0, 1]
+    assert loaded.lookup('member_id', "M2") == [1]
@@ -0,0 +1,29 @@
+"""BackgroundWorker job ordering (no display needed)"""
+
+import threading
+
+from gui_worker import BackgroundWorker
+
+
+class FakeRoot:
+    def after(self, ms, fn):
+        pass
+
+
+def test_reads_are_superseded_but_writes_always_run():
+    worker = BackgroundWorker(FakeRoot())
+    gate = threading.Event()
+    results = []
+    worker.submit('startup', gate.wait)  # keeps the jobs below queued
+    worker.submit('borrow', lambda: 1, results.append, supersede=False)
+    worker.submit('borrow', lambda: 2, results.append, supersede=False)
+    worker.submit('search', lambda: 'old', results.append)
+    worker.submit('search', lambda: 'new', results.append)
+    gate.set()
+
+    done = threading.Event()
+    worker.submit('probe', done.set, supersede=False)  # runs after every job above
+    assert done.wait(5)
+    while worker.pending:
+        worker._poll()
+    assert results == [1, 2, 'new']
@@ -0,0 +1,28 @@
+"""Date-range reads of the transaction log"""
+
+from log_segments import rows_between
+
+FIELDS = ['member_id', 'isbn', 'date']
+
+
+def write_log(path, dates, blank_lines=0):
+    with open(path, 'w', newline='') as f:
+        f.write(','.join(FIELDS) + '\n')
+        for i, date in enumerate(dates):
+            f.write(f"M{i},97800000000{i:02},{date}\n" + '\n' * blank_lines)
+
+
+def test_range_is_exact(tmp_path):
+    path = str(tmp_path / "transactions.csv")
+    dates = [f"2024-01-{day:02} 10:00:00" for day in range(1, 29)]
+    write_log(path, dates)
+    found = [t['date'] for t in rows_between(path, FIELDS, "2024-01-10", "2024-01-20")]
+    assert found == dates[9:20]
+
+
+def test_blank_lines_do_not_pull_in_older_rows(tmp_path):
+    path = str(tmp_path / "transactions.csv")
+    dates = [f"2024-01-{day:02} 10:00:00" for day in range(1, 11)]
+    write_log(path, dates, blank_lines=50)  # most probes land on a blank line
+    found = [t['date'] for t in rows_between(path, FIELDS, "2024-01-08")]
+    assert found == dates[7:]
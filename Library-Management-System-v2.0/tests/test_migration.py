@@ -0,0 +1,28 @@
+"""CSV -> SQLite migration"""
+
+import os
+
+import main
+from main import Library
+from sqlite_backend import SqliteBackend, migrate_csv_to_sqlite
+
+
+def test_migration_keeps_availability_and_open_loans(library, reopen):
+    on_loan, returned = library[1], library[2]
+    Library.borrow_book("M1", on_loan)
+    Library.borrow_book("M2", returned)
+    Library.edit_book(on_loan, new_title="Renamed")  # books.csv rewritten with both on loan
+    Library.return_book("M2", returned)
+    reopen()
+
+    db_name = os.path.join(main.DATA_DIR, "migrated.db")
+    migrate_csv_to_sqlite(main.DATA_DIR, db_name)
+    backend = SqliteBackend(db_name)
+    try:
+        available = {b['isbn']: b['available'] for b in backend.load_books()}
+        loans = [tuple(row) for row in backend.conn.execute("SELECT member_id, isbn FROM open_loans")]
+    finally:
+        backend.close()
+
+    assert available == {isbn: 'False' if isbn == on_loan else 'True' for isbn in library}
+    assert loans == [("M1", on_loan)]
@@ -0,0 +1,142 @@
+"""LibraryStore and the backends: loans, checkpoints and failed writes"""
+
+import itertools
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+import main
+from main import Library, LibraryStore
+
+APP_DIR = os.path.dirname(os.path.abspath(main.__file__))
+
+
+def test_member_with_loan_cannot_be_deleted(backend_name, library):
+    Library.borrow_book("M1", library[0])
+    with pytest.raises(Exception, match="borrowed"):
+        Library.delete_member("M1")
+
+    Library.return_book("M1", library[0])
+    Library.delete_member("M1")
+    assert "M1" not in LibraryStore.get().members
+
+
+def test_own_checkpoints_do_not_reload_store(library, reopen, monkeypatch):
+    Library.borrow_book("M1", library[0])
+    reopen()  # the next load starts from the checkpoint and snapshot
+    store = LibraryStore.get()
+    monkeypatch.setattr(main, 'STALE_CHECK_SECONDS', 0)  # look for changes on every call
+
+    for _ in range(main.CHECKPOINT_INTERVAL // 2 + 10):
+        Library.return_book("M1", library[0])
+        Library.borrow_book("M1", library[0])
+    assert LibraryStore._instance is store
+
+
+@pytest.mark.parametrize('method, call', [
+    ('update_book', lambda books: Library.edit_book(books[0], new_title="Renamed")),
+    ('delete_book', lambda books: Library.delete_book(books[0])),
+    ('delete_member', lambda books: Library.delete_member("M1")),
+    ('commit_batch', lambda books: Library.borrow_book("M1", books[0])),
+])
+def test_failed_write_reloads_store(backend_name, library, monkeypatch, method, call):
+    def fail(*args, **kwargs):
+        raise Exception("disk full")
+    LibraryStore.get()
+    with monkeypatch.context() as patch:
+        patch.setattr(main.get_backend(), method, fail)
+        with pytest.raises(Exception, match="disk full"):
+            call(library)
+
+    store = LibraryStore.get()
+    book = store.books[library[0]]
+    assert book['title'] == "Book 0" and book['available'] == 'True'
+    assert "M1" in store.members and not store.loans
+    assert store.available_books == len(library)
+
+
+def test_batch_failing_partway_applies_nothing(backend_name, library, reopen, monkeypatch):
+    before = LibraryStore.get().total_transactions
+    backend = main.get_backend()
+    with monkeypatch.context() as patch:
+        if backend_name == 'sqlite':
+            insert = backend._insert_transaction
+            rows = itertools.count()
+
+            def failing(t):
+                if next(rows) == 2:
+                    raise sqlite3.OperationalError("database is locked")
+                insert(t)
+            patch.setattr(backend, '_insert_transaction', failing)
+        else:
+            def failing(*args, **kwargs):  # the availability bits are already set by now
+                raise OSError("No space left on device")
+            patch.setattr(backend.journal, 'append', failing)
+
+        with pytest.raises(Exception):
+            Library.borrow_many("M1", library)
+
+    def untouched():
+        store = LibraryStore.get()
+        return (all(store.books[isbn]['available'] == 'True' for isbn in library)
+                and not store.loans_for_member("M1") and store.total_transactions == before)
+
+    assert untouched()  # in memory
+    reopen()
+    assert untouched()  # on disk
+
+
+def test_book_edit_keeps_loan_made_at_another_desk(library, monkeypatch):
+    LibraryStore.get()
+    monkeypatch.setattr(main, 'STALE_CHECK_SECONDS', 3600)  # this desk has not looked yet
+    other_desk = f"import sys; sys.path.insert(0, {APP_DIR!r}); import main; " \
+                 f"main.Library.borrow_book('M2', {library[1]!r})"
+    subprocess.run([sys.executable, '-c', other_desk], check=True)
+
+    with pytest.raises(Exception, match="another desk"):
+        Library.edit_book(library[0], new_title="Renamed")
+    assert LibraryStore.get().books[library[1]]['available'] == 'False'
+
+    Library.edit_book(library[0], new_title="Renamed")  # fine once reloaded
+    assert LibraryStore.get().books[library[1]]['available'] == 'False'
+
+
+def test_listings_are_copies(backend_name, library):
+    roles = {name: user['role'] for name, user in LibraryStore.get().users.items()}
+    for book in Library.view_all_books() + Library.search_books("Book"):
+        book['available'] = 'False'
+    for member in Library.view_all_members():
+        member['name'] = "Changed"
+    for user in Library.get_all_users():
+        user['role'] = "admin"
+
+    store = LibraryStore.get()
+    assert all(book['available'] == 'True' for book in store.books.values())
+    assert store.available_books == len(library)
+    assert store.members["M1"]['name'] == "Member M1"
+    assert {name: user['role'] for name, user in store.users.items()} == roles
+
+
+def test_batch_rows_share_one_date(backend_name, library):
+    Library.borrow_many("M1", library[:3])
+    Library.return_many("M1", library[:3])
+    rows = Library.view_transactions()
+    assert [(t['action'], t['isbn']) for t in rows] == \
+        [("BORROW", isbn) for isbn in library[:3]] + [("RETURN", isbn) for isbn in library[:3]]
+    assert len({t['date'] for t in rows[:3]}) == 1 and len({t['date'] for t in rows[3:]}) == 1
+    assert all(t['due_date'] for t in rows[:3]) and not any(t['due_date'] for t in rows[3:])
+
+
+def test_dashboard_counters_match_a_reload(backend_name, library, reopen):
+    Library.borrow_many("M1", library[:2])
+    Library.return_book("M1", library[0])
+    Library.delete_book(library[4])
+    live = Library.get_dashboard_stats()
+    assert (live['total_books'], live['borrowed_books'], live['currently_borrowed']) == (4, 1, 1)
+
+    reopen()
+    assert Library.get_dashboard_stats() == live
+    assert LibraryStore.get().stats() == live
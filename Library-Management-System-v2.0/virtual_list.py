@@ -0,0 +1,169 @@
+"""
+virtual_list.py - Listbox that only renders the rows on screen
+The data source is any indexable sequence (len() + [i]) of rows. Only the
+visible window is formatted and inserted into the Listbox, so showing 100k
+books or 2M log lines costs the same as showing 15. Scrolling re-renders the
+window; the scrollbar, mouse wheel and PgUp/PgDn/Home/End move it.
+
+Columns are (title, width, text) or (title, width, text, sort_key) tuples,
+where text(row) is the cell value. Clicking a column title sorts by it
+(again to reverse); sorting reorders an index list and formats nothing.
+"""
+
+import tkinter as tk
+
+WHEEL_ROWS = 3
+
+
+class VirtualList(tk.Frame):
+    def __init__(self, parent, columns, height=15, empty_text="No rows"):
+        super().__init__(parent)
+        self.columns = columns
+        self.height = height
+        self.empty_text = empty_text
+        self.rows = []
+        self.order = None        # row indexes in display order; None = source order
+        self.sort_column = None
+        self.descending = False
+        self.first = 0           # display index of the top visible row
+
+        header = tk.Frame(self)
+        header.pack(fill="x")
+        self.header_buttons = []
+        for i, column in enumerate(columns):
+            button = tk.Button(header, text=column[0], width=column[1], anchor="w", relief="flat",
+                               font=("Courier", 9, "bold"), command=lambda i=i: self.sort_by(i))
+            button.pack(side="left")
+            self.header_buttons.append(button)
+
+        body = tk.Frame(self)
+        body.pack(fill="both", expand=True)
+        line_width = sum(column[1] for column in columns) + 3 * (len(columns) - 1)
+        self.listbox = tk.Listbox(body, width=line_width, height=height, font=("Courier", 9),
+                                  activestyle="none")
+        self.scrollbar = tk.Scrollbar(body, orient="vertical", command=self.yview)
+        self.listbox.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        footer = tk.Frame(self)
+        footer.pack(fill="x")
+        self.position = tk.Label(footer, text="", anchor="w")
+        self.position.pack(side="left")
+        tk.Button(footer, text="Go", command=self._jump_from_entry).pack(side="right")
+        self.jump_entry = tk.Entry(footer, width=8)
+        self.jump_entry.pack(side="right")
+        tk.Label(footer, text="Go to row").pack(side="right")
+
+        self.listbox.bind("<MouseWheel>", self._on_wheel)
+        self.listbox.bind("<Button-4>", lambda e: self._scroll(-WHEEL_ROWS))
+        self.listbox.bind("<Button-5>", lambda e: self._scroll(WHEEL_ROWS))
+        self.listbox.bind("<Prior>", lambda e: self._scroll(-self.height))
+        self.listbox.bind("<Next>", lambda e: self._scroll(self.height))
+        self.listbox.bind("<Home>", lambda e: self.jump_to(0))
+        self.listbox.bind("<End>", lambda e: self.jump_to(len(self.rows) - 1))
+        self.jump_entry.bind("<Return>", lambda e: self._jump_from_entry())
+
+    # ---------- data ----------
+
+    def set_rows(self, rows):
+        """Show a new data source, keeping the current sort column"""
+        self.rows = rows
+        self.order = None
+        self.first = 0
+        if self.sort_column is not None:
+            self._sort()
+        self._render()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def row(self, index):
+        """Row at a display position (after sorting)"""
+        return self.rows[self.order[index] if self.order is not None else index]
+
+    def selected(self):
+        """The selected row, or None"""
+        selection = self.listbox.curselection()
+        if not selection or not self.rows:
+            return None
+        return self.row(self.first + selection[0])
+
+    # ---------- sorting ----------
+
+    def sort_by(self, column):
+        if self.sort_column == column:
+            self.descending = not self.descending
+        else:
+            self.sort_column = column
+            self.descending = False
+        self._sort()
+        self.first = 0
+        self._render()
+
+    def _sort(self):
+        column = self.columns[self.sort_column]
+        key = column[3] if len(column) > 3 else column[2]
+        rows = self.rows
+        self.order = sorted(range(len(rows)), key=lambda i: key(rows[i]), reverse=self.descending)
+        for i, button in enumerate(self.header_buttons):
+            title = self.columns[i][0]
+            if i == self.sort_column:
+                title += " ▼" if self.descending else " ▲"
+            button.config(text=title)
+
+    # ---------- scrolling ----------
+
+    def yview(self, *args):
+        """Scrollbar protocol: ('moveto', fraction) or ('scroll', n, 'units'|'pages')"""
+        if not args:
+            return
+        if args[0] == 'moveto':
+            self.first = int(float(args[1]) * len(self.rows))
+            self._render()
+        elif args[0] == 'scroll':
+            step = self.height if args[2] == 'pages' else 1
+            self._scroll(int(args[1]) * step)
+
+    def jump_to(self, index):
+        """Scroll so that display row index is at the top and select it"""
+        self.first = index
+        self._render()
+        if self.rows:
+            self.listbox.selection_clear(0, tk.END)
+            self.listbox.selection_set(max(0, min(index, len(self.rows) - 1)) - self.first)
+
+    def _jump_from_entry(self):
+        text = self.jump_entry.get().strip()
+        if text.isdigit():
+            self.jump_to(int(text) - 1)  # rows are numbered from 1 on screen
+
+    def _on_wheel(self, event):
+        self._scroll(-WHEEL_ROWS if event.delta > 0 else WHEEL_ROWS)
+        return "break"
+
+    def _scroll(self, rows):
+        self.first += rows
+        self._render()
+        return "break"
+
+    # ---------- drawing ----------
+
+    def _render(self):
+        total = len(self.rows)
+        self.first = max(0, min(self.first, total - self.height))
+        last = min(self.first + self.height, total)
+
+        self.listbox.delete(0, tk.END)
+        if not total:
+            self.listbox.insert(tk.END, self.empty_text)
+            self.scrollbar.set(0.0, 1.0)
+            self.position.config(text="")
+            return
+
+        for index in range(self.first, last):
+            self.listbox.insert(tk.END, self._format(self.row(index)))
+        self.scrollbar.set(self.first / total, last / total)
+        self.position.config(text=f"Rows {self.first + 1:,}-{last:,} of {total:,}")
+
+    def _format(self, row):
+        return " | ".join(f"{column[2](row)!s:<{column[1]}}" for column in self.columns)